@@ -0,0 +1,373 @@
+"""Local HTTP/JSON API in front of the response engine.
+
+A small asyncio HTTP/1.1 server (standard library only) with keep-alive:
+
+    POST /answer          {"query": "...", "language": "hindi"}
+    POST /answer/batch    {"queries": ["...", {"id": 1, "query": "...", "language": "..."}], "language": "..."}
+    GET  /sections        ?q=section 376 (every paragraph citing the sections, articles or acts in q)
+    GET  /translations    ?language=tamil (all languages when omitted)
+    GET  /healthz         pattern store version and load statistics
+    GET  /metrics         stage latencies and hit counters (Prometheus text format)
+    GET  /metrics/patterns  patterns never hit, recent no_response queries and typo corrections
+
+Add "profile": true (or ?profile=1) to an answer request to get a sampling
+profile of that request back. Metrics are per worker process.
+
+Run with several workers sharing one listening socket:
+
+    python api_server.py --port 8080 --workers 4
+
+The pattern file is loaded before the workers are forked, so they start from
+the same read-only pages. Each worker picks up changes to legal_patterns.json
+on its own (and immediately on SIGHUP); in-flight requests keep the snapshot
+they started with. Answers and reloads run in a thread pool, so a slow reload
+of a large pattern file never stalls the other connections of a worker.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+import semantic_index
+from engine import get_engine
+from matcher import normalize_text
+from section_index import SectionIndex
+from translations import resolve_language, translations
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH = 256
+KEEP_ALIVE_TIMEOUT = 15
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiServer:
+    """Routes JSON requests to a shared ResponseEngine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        # Engine work never runs on the event loop: a query can trigger a pattern
+        # reload (read, hash, parse, matcher rebuild) or a semantic model pass
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.connections = set()
+
+    def _answer_all(self, items, profile):
+        if not profile:
+            return [self.engine.answer(query, language) for query, language in items], None
+        with metrics.SamplingProfiler() as profiler:
+            answers = [self.engine.answer(query, language) for query, language in items]
+        return answers, {"samples": sum(profiler.samples.values()), "top": profiler.top()}
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def _answer_many(self, items, profile=False):
+        """Answer (query, language) pairs; also returns a sampling profile if requested."""
+        return await self._run(self._answer_all, items, profile)
+
+    def reload(self):
+        """Reload the engine's pattern files in the executor, keeping the event loop free."""
+        return asyncio.get_running_loop().run_in_executor(self.executor, self.engine.reload)
+
+    async def handle_answer(self, body, query_string):
+        payload = _json_body(body)
+        if not isinstance(payload.get("query"), str):
+            raise HttpError(400, '"query" must be a string')
+        language = _language(payload, "language")
+        [answer], profile = await self._answer_many(
+            [(payload["query"], language)], _wants_profile(payload, query_string)
+        )
+        result = _answer_dict(answer)
+        if profile is not None:
+            result["profile"] = profile
+        return result
+
+    async def handle_batch(self, body, query_string):
+        payload = _json_body(body)
+        queries = payload.get("queries")
+        if not isinstance(queries, list):
+            raise HttpError(400, '"queries" must be a list')
+        if len(queries) > MAX_BATCH:
+            raise HttpError(413, f"at most {MAX_BATCH} queries per batch")
+
+        default_language = _language(payload, "language")
+        ids, items = [], []
+        for number, item in enumerate(queries):
+            if isinstance(item, str):
+                item = {"query": item}
+            if not isinstance(item, dict) or not isinstance(item.get("query"), str):
+                raise HttpError(400, f"queries[{number}] must be a string or an object with a \"query\"")
+            ids.append(item.get("id", number))
+            items.append((item["query"], _language(item, f"queries[{number}].language", default_language)))
+
+        answers, profile = await self._answer_many(items, _wants_profile(payload, query_string))
+        result = {"answers": [dict(_answer_dict(answer), id=id_) for id_, answer in zip(ids, answers)]}
+        if profile is not None:
+            result["profile"] = profile
+        return result
+
+    async def handle_sections(self, body, query_string):
+        return await self._run(self._sections, parse_qs(query_string).get("q", [""])[0])
+
+    def _sections(self, query):
+        snapshot = self.engine.store.snapshot()
+        index = snapshot.derived("sections", SectionIndex.from_snapshot)
+        return {
+            key: [
+                {"index": hit.index, "pattern": snapshot.patterns[hit.index]["pattern"], "text": hit.text}
+                for hit in index.hits(key)
+            ]
+            for key in index.query_keys(normalize_text(query))
+        }
+
+    async def handle_translations(self, body, query_string):
+        language = parse_qs(query_string).get("language", [None])[0]
+        if language is None:
+            return translations
+        return {resolve_language(language): translations[resolve_language(language)]}
+
+    async def handle_health(self, body, query_string):
+        cache = self.engine.cache.stats() if self.engine.cache is not None else None
+        return {"status": "ok", "pid": os.getpid(), "patterns": self.engine.store.stats(), "cache": cache}
+
+    async def handle_metrics(self, body, query_string):
+        return metrics.render_prometheus()
+
+    async def handle_pattern_report(self, body, query_string):
+        return await self._run(self._pattern_report)
+
+    def _pattern_report(self):
+        unhit = metrics.unhit_patterns(self.engine.store.snapshot())
+        return {
+            "pid": os.getpid(),
+            "unhit_patterns": [{"index": index, "pattern": pattern} for index, pattern in unhit],
+            "recent_misses": list(metrics.REGISTRY.recent_misses),
+            "recent_corrections": list(metrics.REGISTRY.recent_corrections),
+        }
+
+    def route(self, method, path):
+        routes = {
+            "/answer": ("POST", self.handle_answer),
+            "/answer/batch": ("POST", self.handle_batch),
+            "/sections": ("GET", self.handle_sections),
+            "/translations": ("GET", self.handle_translations),
+            "/healthz": ("GET", self.handle_health),
+            "/metrics": ("GET", self.handle_metrics),
+            "/metrics/patterns": ("GET", self.handle_pattern_report),
+        }
+        if path not in routes:
+            raise HttpError(404, "not found")
+        allowed, handler = routes[path]
+        if method != allowed:
+            raise HttpError(405, f"use {allowed}")
+        return handler
+
+    async def handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    await _write_response(writer, 400, {"error": "bad request line"}, False)
+                    break
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                try:
+                    length = int(headers.get("content-length", "0"))
+                    if length > MAX_BODY_BYTES:
+                        raise HttpError(413, "request body too large")
+                    body = await reader.readexactly(length) if length else b""
+                except ValueError:
+                    await _write_response(writer, 400, {"error": "invalid Content-Length"}, False)
+                    break
+                except HttpError as error:
+                    # The unread body would otherwise be parsed as the next request
+                    await _write_response(writer, error.status, {"error": str(error)}, False)
+                    break
+
+                try:
+                    url = urlsplit(target)
+                    result = await self.route(method, url.path)(body, url.query)
+                    status = 200
+                except HttpError as error:
+                    result, status = {"error": str(error)}, error.status
+                except Exception as error:
+                    # Always answer, so a handler bug never drops the connection without a response
+                    metrics.record_error("api", error)
+                    result, status = {"error": "internal server error"}, 500
+                await _write_response(writer, status, result, keep_alive)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+
+def _json_body(body):
+    try:
+        payload = json.loads(body or b"{}")
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise HttpError(400, "body must be JSON")
+    if not isinstance(payload, dict):
+        raise HttpError(400, "body must be a JSON object")
+    return payload
+
+
+def _language(payload, field, default="English"):
+    """Resolve the optional "language" of a request object, rejecting non-strings."""
+    value = payload.get("language")
+    if value is not None and not isinstance(value, str):
+        raise HttpError(400, f'"{field}" must be a string')
+    return resolve_language(value, default)
+
+
+def _answer_dict(answer):
+    return {
+        "query": answer.query,
+        "language": answer.language,
+        "response": answer.response,
+        "matched": answer.matched,
+        "source": answer.source,
+        "pattern": answer.pattern,
+        "version": answer.version,
+        "corrections": [correction._asdict() for correction in answer.corrections],
+    }
+
+
+def _wants_profile(payload, query_string):
+    return bool(payload.get("profile")) or parse_qs(query_string).get("profile") == ["1"]
+
+
+async def _write_response(writer, status, payload, keep_alive):
+    # Handlers return dicts (sent as JSON) or text (the Prometheus exposition format)
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+    await writer.drain()
+
+
+async def serve(sock, engine):
+    """Serve on an already bound socket until SIGTERM/SIGINT, reloading on SIGHUP."""
+    api = ApiServer(engine)
+    server = await asyncio.start_server(api.handle_connection, sock=sock)
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stopping.set)
+    loop.add_signal_handler(signal.SIGINT, stopping.set)
+    loop.add_signal_handler(signal.SIGHUP, api.reload)
+
+    async with server:
+        await stopping.wait()
+        # Stop accepting, then give open keep-alive connections a moment to finish
+        server.close()
+        if api.connections:
+            await asyncio.wait(list(api.connections), timeout=5)
+    api.executor.shutdown(wait=False)
+
+
+def _run_worker(sock, engine):
+    asyncio.run(serve(sock, engine))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/JSON API for the Legal Law Advisor Bot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--patterns", default="legal_patterns.json")
+    parser.add_argument("--no-semantic", action="store_true", help="use keyword matching only")
+    args = parser.parse_args()
+
+    # Load the pattern index once in the parent so forked workers share its pages
+    engine = get_engine(args.patterns)
+    engine.semantic = not args.no_semantic
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(1024)
+    sock.setblocking(False)
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} worker(s)")
+
+    if args.workers <= 1:
+        _run_worker(sock, engine)
+        return
+
+    children = []
+    for _ in range(args.workers):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                # The parent builds a missing semantic index once, instead of every worker
+                semantic_index.AUTOBUILD = False
+                _run_worker(sock, engine)
+            finally:
+                os._exit(0)
+        children.append(pid)
+    if engine.semantic and semantic_index.AUTOBUILD:
+        # Started after forking, so no worker inherits the build thread or the model;
+        # workers look for the index again every LEGAL_BOT_SEMANTIC_RETRY seconds
+        # (build_index returns at once when the index is up to date)
+        snapshot = engine.store.snapshot()
+        if snapshot.patterns:
+            semantic_index.build_in_background(snapshot)
+
+    def _forward(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+    signal.signal(signal.SIGHUP, _forward)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Answer a file of queries without the Streamlit UI.
+
+Input is JSONL (one object with a "query" field, or a bare JSON string, per
+line) or CSV with a "query" column. Optional "id" and "language" fields are
+passed through, the language resolved as by the API ("hindi", "hi", ...).
+Results are written as JSONL in input order:
+
+    python batch_cli.py queries.jsonl -o answers.jsonl --workers 4
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+from engine import DEFAULT_LANGUAGE, get_engine
+from translations import resolve_language
+
+_worker_engine = None
+
+
+def read_queries(path, default_language=DEFAULT_LANGUAGE):
+    """Stream query rows from a JSONL or CSV file ("-" reads JSONL from stdin).
+
+    Languages are resolved like the API does, so "hindi", "Hindi" and "hi" all
+    select the Hindi patterns; unknown languages fall back to `default_language`.
+    """
+    default_language = resolve_language(default_language, DEFAULT_LANGUAGE)
+    file = sys.stdin if path == "-" else open(path, "r", encoding="utf-8", newline="")
+    try:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(file)
+        else:
+            rows = (json.loads(line) for line in file if line.strip())
+        for number, row in enumerate(rows):
+            if isinstance(row, str):
+                row = {"query": row}
+            language = row.get("language")
+            yield {
+                "id": row.get("id", number),
+                "query": row.get("query") or "",
+                "language": resolve_language(language if isinstance(language, str) else None, default_language),
+            }
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def _init_worker(patterns_path, semantic):
+    # Each worker process loads the pattern store once and reuses it for every row
+    global _worker_engine
+    _worker_engine = get_engine(patterns_path)
+    _worker_engine.semantic = semantic
+
+
+def answer_row(row):
+    answer = _worker_engine.answer(row["query"], row["language"])
+    return {
+        "id": row["id"],
+        "query": row["query"],
+        "language": row["language"],
+        "response": answer.response,
+        "matched": answer.matched,
+        "source": answer.source,
+        "pattern": answer.pattern,
+        "corrections": [correction._asdict() for correction in answer.corrections],
+    }
+
+
+def run(input_path, output, patterns_path, workers=1, chunksize=64, semantic=True, language=DEFAULT_LANGUAGE):
+    """Answer every row of `input_path` and write JSONL to the `output` file object."""
+    rows = read_queries(input_path, language)
+    if workers <= 1:
+        _init_worker(patterns_path, semantic)
+        results = map(answer_row, rows)
+        pool = None
+    else:
+        pool = Pool(workers, initializer=_init_worker, initargs=(patterns_path, semantic))
+        results = pool.imap(answer_row, rows, chunksize=chunksize)
+
+    count = 0
+    try:
+        for result in results:
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch-answer legal queries from a JSONL or CSV file")
+    parser.add_argument("input", help="JSONL or CSV file with queries, or - for JSONL on stdin")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default: stdout)")
+    parser.add_argument("--patterns", default="legal_patterns.json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--language", default=DEFAULT_LANGUAGE, help="language for rows without one")
+    parser.add_argument("--no-semantic", action="store_true", help="use keyword matching only")
+    args = parser.parse_args()
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        count = run(
+            args.input,
+            output,
+            args.patterns,
+            workers=args.workers,
+            chunksize=args.chunksize,
+            semantic=not args.no_semantic,
+            language=args.language,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"Answered {count} queries.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
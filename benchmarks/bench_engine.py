@@ -0,0 +1,162 @@
+"""Throughput and latency benchmark for the response engine.
+
+Grows the pattern file with synthetic entries and reports queries/sec,
+p50/p95/p99 latency and allocated memory per query for each size:
+
+    python -m benchmarks.bench_engine --sizes 119 10000 100000
+    python -m benchmarks.bench_engine --sizes 10000 --max-p99-ms 2 --json
+
+With --max-p99-ms / --min-qps the exit status is 1 when a size misses the
+target, so the benchmark can gate regressions in CI.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from engine import ResponseEngine
+from pattern_store import PatternStore
+from response_cache import ResponseCache
+
+# Consonant-vowel syllables; enough of them that synthetic keywords are about
+# as far apart as real vocabulary, which matters for the fuzzy index
+SYLLABLES = [consonant + vowel for consonant in "bdfgklmnprstvz" for vowel in "aeiou"]
+FILLER = "what is the law about my case with the court and what should i do now".split()
+
+
+def synthetic_word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(3, 5)))
+
+
+def build_patterns(base, size, response_chars, rng):
+    """The real patterns plus synthetic entries until there are `size` of them."""
+    patterns = list(base[:size])
+    filler = (base[0]["response"] * (response_chars // len(base[0]["response"]) + 1))[:response_chars]
+    while len(patterns) < size:
+        keyword = " ".join(synthetic_word(rng) for _ in range(rng.randint(1, 2)))
+        patterns.append({"pattern": keyword + " ", "response": f"{keyword}: {filler}"})
+    return patterns
+
+
+def build_queries(patterns, count, hit_ratio, rng):
+    queries = []
+    for _ in range(count):
+        words = rng.sample(FILLER, 6)
+        if rng.random() < hit_ratio:
+            keyword = rng.choice(patterns)["pattern"].split("|")[0].strip()
+            words.insert(rng.randrange(len(words)), keyword)
+        else:
+            words.insert(rng.randrange(len(words)), synthetic_word(rng) + "x")
+        queries.append(" ".join(words))
+    return queries
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def max_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_size(base, size, args, rng):
+    patterns = build_patterns(base, size, args.response_chars, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "patterns.json")
+        with open(path, "w") as file:
+            json.dump(patterns, file)
+
+        started = time.perf_counter()
+        store = PatternStore(path, check_interval=3600)
+        load_seconds = time.perf_counter() - started
+        engine = ResponseEngine(store, semantic=False, cache=ResponseCache() if args.cache else None)
+
+        queries = build_queries(patterns, args.queries, args.hit_ratio, rng)
+        for query in queries[: args.warmup]:
+            engine.answer(query)
+
+        latencies = []
+        hits = 0
+        started = time.perf_counter()
+        for query in queries:
+            query_started = time.perf_counter()
+            answer = engine.answer(query)
+            latencies.append(time.perf_counter() - query_started)
+            hits += answer.matched
+        elapsed = time.perf_counter() - started
+
+        # Allocation cost per query, measured separately so tracing does not skew latency
+        sample = queries[: args.memory_sample]
+        tracemalloc.start()
+        for query in sample:
+            engine.answer(query)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "patterns": size,
+        "keywords": len(store.snapshot().matcher),
+        "load_ms": load_seconds * 1000,
+        "queries": len(queries),
+        "hit_rate": hits / len(queries),
+        "qps": len(queries) / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_kb_per_query": peak / 1024,
+        "max_rss_mb": max_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the response engine as the pattern count grows")
+    parser.add_argument("--patterns", default="legal_patterns.json")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[119, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--hit-ratio", type=float, default=0.5)
+    parser.add_argument("--response-chars", type=int, default=700)
+    parser.add_argument("--memory-sample", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache", action="store_true", help="answer through the shared response cache")
+    parser.add_argument("--json", action="store_true", help="print results as JSON lines")
+    parser.add_argument("--max-p99-ms", type=float, help="fail if any size has a slower p99")
+    parser.add_argument("--min-qps", type=float, help="fail if any size answers fewer queries/sec")
+    args = parser.parse_args()
+
+    with open(args.patterns, "r") as file:
+        base = json.load(file)
+    rng = random.Random(args.seed)
+
+    failed = False
+    if not args.json:
+        print(f"{'patterns':>9} {'load ms':>9} {'qps':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'KB/query':>9} {'RSS MB':>8}")
+    for size in args.sizes:
+        result = run_size(base, size, args, rng)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(
+                f"{result['patterns']:>9} {result['load_ms']:>9.1f} {result['qps']:>10.0f} "
+                f"{result['p50_ms']:>8.3f} {result['p95_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+                f"{result['peak_kb_per_query']:>9.1f} {result['max_rss_mb']:>8.1f}"
+            )
+        if args.max_p99_ms is not None and result["p99_ms"] > args.max_p99_ms:
+            failed = True
+        if args.min_qps is not None and result["qps"] < args.min_qps:
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
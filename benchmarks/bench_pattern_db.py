@@ -0,0 +1,157 @@
+"""Loader benchmark: json.load versus the memory-mapped compiled pattern database.
+
+For each size the pattern file is grown with the same synthetic entries as
+bench_engine, compiled with pattern_db, and then loaded in fresh interpreters:
+
+    python -m benchmarks.bench_pattern_db --sizes 119 10000 100000 --repeat 3
+
+Two things are measured per format: loading the entries alone (json.load
+versus opening the mapping) and a full PatternStore start, which also builds
+the keyword matcher and answers one query. Memory is the growth in resident
+and private (unshared) memory over the load; mapped pages of the compiled file
+are shared between processes and count as resident but not private.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_engine import build_patterns
+from pattern_db import pattern_db_path, write_pattern_db
+
+LOAD = """
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+
+def memory():
+    # Resident and private memory in MB from /proc (Linux); None elsewhere
+    try:
+        with open("/proc/self/smaps_rollup") as file:
+            fields = dict(line.split(":", 1) for line in file if ":" in line)
+    except OSError:
+        return None, None
+    kb = lambda name: int(fields.get(name, "0 kB").split()[0])
+    return kb("Rss") / 1024, (kb("Private_Clean") + kb("Private_Dirty")) / 1024
+
+from pattern_db import PatternDB
+from pattern_store import PatternStore
+from engine import ResponseEngine
+
+rss_before, private_before = memory()
+started = time.perf_counter()
+if {stage!r} == "entries":
+    if {compiled!r}:
+        patterns = PatternDB({db_path!r})
+    else:
+        with open({path!r}, "rb") as file:
+            patterns = json.load(file)
+    matched = len(patterns) > 0
+else:
+    store = PatternStore({path!r}, check_interval=3600)
+    answer = ResponseEngine(store, semantic=False).answer({query!r})
+    matched = answer.matched and store.stats()["compiled"] == {compiled!r}
+elapsed = time.perf_counter() - started
+rss_after, private_after = memory()
+print(json.dumps({{
+    "seconds": elapsed,
+    "matched": matched,
+    "rss_mb": None if rss_after is None else rss_after - rss_before,
+    "private_mb": None if private_after is None else private_after - private_before,
+}}))
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_child(code):
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(path, stage, compiled, query, repeat):
+    # The compiled file is only used by PatternStore when it sits next to the JSON
+    db_path = pattern_db_path(path)
+    hidden = db_path + ".hidden"
+    if not compiled:
+        os.replace(db_path, hidden)
+    try:
+        code = LOAD.format(root=ROOT, stage=stage, compiled=compiled, path=path, db_path=db_path, query=query)
+        runs = [run_child(code) for _ in range(repeat)]
+    finally:
+        if not compiled:
+            os.replace(hidden, db_path)
+    if not all(run["matched"] for run in runs):
+        raise RuntimeError(f"{stage} load with compiled={compiled} did not produce a match")
+
+    def median(field):
+        values = [run[field] for run in runs if run[field] is not None]
+        return statistics.median(values) if values else None
+
+    return {"ms": median("seconds") * 1000, "rss_mb": median("rss_mb"), "private_mb": median("private_mb")}
+
+
+def run_size(base, size, args, rng):
+    patterns = build_patterns(base, size, args.response_chars, rng)
+    query = f"what is the punishment for {patterns[-1]['pattern'].split('|')[0].strip()}"
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "patterns.json")
+        with open(path, "w") as file:
+            json.dump(patterns, file)
+        with open(path, "rb") as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        write_pattern_db(patterns, pattern_db_path(path), digest)
+
+        result = {
+            "size": size,
+            "json_bytes": os.path.getsize(path),
+            "compiled_bytes": os.path.getsize(pattern_db_path(path)),
+        }
+        for stage in ("entries", "store"):
+            for compiled in (False, True):
+                name = f"{stage}_{'compiled' if compiled else 'json'}"
+                result[name] = measure(path, stage, compiled, query, args.repeat)
+    return result
+
+
+def format_memory(value):
+    return "   n/a" if value is None else f"{value:6.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare json.load with the compiled pattern database")
+    parser.add_argument("--patterns", default="legal_patterns.json")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[119, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per measurement")
+    parser.add_argument("--response-chars", type=int, default=700)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    with open(args.patterns, "r") as file:
+        base = json.load(file)
+    rng = random.Random(args.seed)
+    results = [run_size(base, size, args, rng) for size in args.sizes]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'size':>8} {'stage':>8} {'format':>9} {'ms':>9} {'rss MB':>7} {'priv MB':>7}")
+    for result in results:
+        for stage in ("entries", "store"):
+            for kind in ("json", "compiled"):
+                row = result[f"{stage}_{kind}"]
+                print(
+                    f"{result['size']:>8} {stage:>8} {kind:>9} {row['ms']:9.2f}"
+                    f" {format_memory(row['rss_mb'])} {format_memory(row['private_mb'])}"
+                )
+        print(f"{'':>8} file size: json {result['json_bytes']} B, compiled {result['compiled_bytes']} B")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Cold-start benchmark for the text chat path and the lazily imported subsystems.
+
+Each measurement runs in a fresh interpreter:
+
+    python -m benchmarks.bench_startup --repeat 5
+
+Reports the time-to-first-response of the text path (imports, pattern load
+and one answer), checks that it did not import any audio/PDF/pandas/embedding
+library, and times the first import of each of those subsystems on its own.
+Exits with status 1 if the text path pulled in a heavy module or is slower
+than --max-first-response-ms.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Subsystems app.py only needs on demand, with the module lazy_import() loads for each
+SUBSYSTEMS = {
+    "speech recognition": "speech_recognition",
+    "text-to-speech": "pyttsx3",
+    "pdf rendering": "reportlab.pdfgen.canvas",
+    "pdf merging": "pypdf",
+    "pandas": "pandas",
+    "numpy": "numpy",
+    "embeddings": "sentence_transformers",
+}
+
+TEXT_PATH = """
+import json, sys, time
+started = time.perf_counter()
+from engine import get_engine
+answer = get_engine({patterns!r}).answer("what is the punishment for dowry")
+elapsed = time.perf_counter() - started
+heavy = sorted(name for name in {heavy!r} if name.split(".")[0] in sys.modules)
+print(json.dumps({{"first_response": elapsed, "matched": answer.matched, "heavy": heavy}}))
+"""
+
+IMPORT_ONE = """
+import json
+from lazy_imports import IMPORT_TIMES, lazy_import
+try:
+    lazy_import({module!r})
+except Exception as error:
+    print(json.dumps({{"error": type(error).__name__}}))
+else:
+    print(json.dumps({{"seconds": IMPORT_TIMES[{module!r}]}}))
+"""
+
+
+def run_python(code):
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return time.perf_counter() - started, json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start and lazy subsystem import times")
+    parser.add_argument("--patterns", default="legal_patterns.json")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-first-response-ms", type=float, help="fail if the median is slower")
+    args = parser.parse_args()
+
+    heavy_modules = list(SUBSYSTEMS.values())
+    process_times, first_responses, heavy_loaded = [], [], set()
+    for _ in range(args.repeat):
+        wall, result = run_python(TEXT_PATH.format(patterns=args.patterns, heavy=heavy_modules))
+        process_times.append(wall)
+        first_responses.append(result["first_response"])
+        heavy_loaded.update(result["heavy"])
+
+    first_response_ms = statistics.median(first_responses) * 1000
+    print("Text chat path (median of %d cold starts)" % args.repeat)
+    print(f"  time to first response:   {first_response_ms:8.1f} ms")
+    print(f"  process incl. interpreter: {statistics.median(process_times) * 1000:7.1f} ms")
+    print(f"  heavy modules imported:   {', '.join(sorted(heavy_loaded)) or 'none'}")
+
+    print("\nFirst import of each lazily loaded subsystem")
+    for label, module in SUBSYSTEMS.items():
+        samples = []
+        for _ in range(args.repeat):
+            _, result = run_python(IMPORT_ONE.format(module=module))
+            if "error" in result:
+                break
+            samples.append(result["seconds"])
+        if samples:
+            print(f"  {label:<20} {module:<25} {statistics.median(samples) * 1000:8.1f} ms")
+        else:
+            print(f"  {label:<20} {module:<25} {'not installed':>11}")
+
+    failed = bool(heavy_loaded)
+    if args.max_first_response_ms is not None and first_response_ms > args.max_first_response_ms:
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Bounded per-session conversation context for follow-up questions."""
+import os
+import re
+from collections import deque, namedtuple
+
+MAX_TURNS = int(os.environ.get("LEGAL_BOT_CONTEXT_TURNS", "8"))
+
+# One remembered turn. Only the query and a reference to the pattern entry are
+# kept, never the response text, so a turn costs the same however long the
+# answer was.
+Turn = namedtuple("Turn", ["query", "matched", "source", "index", "pattern"])
+
+# Words that refer back to the previous topic ("what is the punishment for it?")
+_REFERENCE = re.compile(r"\b(?:it|its|it's|this|that|these|those|they|them|their|same|above)\b")
+
+# Which paragraph of the topic's response a follow-up asks for, checked in order
+_ASKED_KINDS = [
+    ("punishment", re.compile(r"\b(?:punish\w*|penalt\w*|sentence\w*|jail|imprison\w*|fine|fines)\b")),
+    ("pros", re.compile(r"\b(?:pros|advantages?|benefits?)\b")),
+    ("cons", re.compile(r"\b(?:cons|disadvantages?|drawbacks?|downsides?)\b")),
+    ("ipc sections", re.compile(r"\b(?:sections?|ipc|acts?|provisions?|statutes?)\b")),
+]
+
+
+# Asking for the whole answer again, in more detail
+_MORE = re.compile(r"\b(?:more|explain|details?|elaborate|describe|meaning|mean)\b")
+
+
+def follow_up_kind(query):
+    """What a normalized query asks about the current topic, or None if it is not a follow-up.
+
+    Returns the response paragraph kind ("punishment", "pros", "cons",
+    "ipc sections") or "response" for the whole answer. A reference word
+    alone is not enough: "is it legal to record calls" starts a new topic.
+    """
+    if not _REFERENCE.search(query):
+        return None
+    for kind, pattern in _ASKED_KINDS:
+        if pattern.search(query):
+            return kind
+    return "response" if _MORE.search(query) else None
+
+
+class ConversationContext:
+    """The last `max_turns` turns of a session and the topic they are about.
+
+    The topic is the pattern entry of the last matched answer; it is updated
+    as each answer is recorded, so resolving a follow-up never scans the
+    history. Memory stays constant however long the session runs.
+    """
+
+    def __init__(self, max_turns=MAX_TURNS):
+        self.turns = deque(maxlen=max_turns)
+        self.topic = None
+
+    def __len__(self):
+        return len(self.turns)
+
+    def __iter__(self):
+        return iter(self.turns)
+
+    def record(self, answer):
+        """Remember an engine Answer and move the topic to its entry if it matched one."""
+        self.turns.append(Turn(answer.query, answer.matched, answer.source, answer.index, answer.pattern))
+        if answer.matched and answer.index is not None:
+            self.topic = (answer.index, answer.version)
+
+    def topic_index(self, snapshot):
+        """Index of the current topic in `snapshot`, or None if there is none or the pattern file changed since."""
+        if self.topic is None:
+            return None
+        index, version = self.topic
+        return index if version == snapshot.version else None
+
+    def clear(self):
+        self.turns.clear()
+        self.topic = None
@@ -0,0 +1,207 @@
+"""Streamlit-free response engine shared by the chat UI, the batch CLI and benchmarks."""
+import os
+import threading
+from collections import namedtuple
+
+import metrics
+from conversation import follow_up_kind
+from fuzzy_index import FuzzyIndex
+from matcher import normalize_text, normalize_unicode
+from pattern_store import get_pattern_store
+from response_cache import ResponseCache
+from section_index import SectionIndex, might_cite
+from semantic_index import semantic_lookup
+from translations import LANGUAGE_CODES, translations
+
+DEFAULT_LANGUAGE = "English"
+MIN_QUERY_LENGTH = 3
+
+# Localized pattern files live next to the English one, in this folder
+LOCALES_FOLDER = "locales"
+
+# Result of answering one query. `source` says which stage produced the
+# response: "context", "localized", "section", "pattern", "fuzzy", "semantic", or None
+# when falling back to no_response. `corrections` lists the typo corrections a fuzzy match used.
+Answer = namedtuple(
+    "Answer",
+    ["query", "language", "response", "matched", "source", "pattern", "index", "version", "corrections"],
+    defaults=((),),
+)
+
+
+class ResponseEngine:
+    """Answers legal queries from a PatternStore without any UI state."""
+
+    def __init__(self, store=None, semantic=True, cache=None):
+        self.store = store or get_pattern_store()
+        self.semantic = semantic
+        self.cache = cache
+        self._locale_stores = {}
+        self._locale_lock = threading.Lock()
+
+    def locale_path(self, language):
+        code = LANGUAGE_CODES.get(language)
+        if code is None:
+            return None
+        folder = os.path.join(os.path.dirname(self.store.path), LOCALES_FOLDER)
+        return os.path.join(folder, f"legal_patterns.{code}.json")
+
+    def locale_store(self, language):
+        """Return the PatternStore of a language's keywords, or None if it has no pattern file.
+
+        Stores are created on the first query in their language, so a process
+        only keeps the localized patterns of languages that are actually used.
+        """
+        try:
+            return self._locale_stores[language]
+        except KeyError:
+            pass
+        with self._locale_lock:
+            if language not in self._locale_stores:
+                path = self.locale_path(language)
+                store = None
+                if path is not None and os.path.exists(path):
+                    store = get_pattern_store(path, normalize=normalize_unicode)
+                self._locale_stores[language] = store
+            return self._locale_stores[language]
+
+    def reload(self):
+        """Re-check the English pattern file and every localized file loaded so far."""
+        self.store.reload()
+        for store in list(self._locale_stores.values()):
+            if store is not None:
+                store.reload()
+
+    def no_response(self, language):
+        return translations.get(language, translations[DEFAULT_LANGUAGE])["no_response"]
+
+    def answer(self, query, language=DEFAULT_LANGUAGE, context=None):
+        """Return the Answer for a raw user query.
+
+        With a ConversationContext, follow-up questions about the current
+        topic are answered from it first, and the answer is recorded in it.
+        """
+        with metrics.timer("get_response"):
+            query = normalize_text(query)
+            snapshot = self.store.snapshot()
+            answer = self._follow_up(snapshot, query, language, context) if context is not None else None
+            if answer is None:
+                answer = self._cached_answer(snapshot, query, language)
+        if context is not None:
+            context.record(answer)
+        metrics.record_answer(answer, snapshot)
+        return answer
+
+    def _cached_answer(self, snapshot, query, language):
+        locale_store = self.locale_store(language)
+        local = locale_store.snapshot() if locale_store is not None else None
+        # A localized file reload must not empty the whole cache, so its version is part of the key
+        key = (query, language, local.version if local is not None else None)
+        answer = self.cache.get(key, snapshot.version) if self.cache is not None else None
+        if answer is None:
+            answer = self._answer(snapshot, query, language, local)
+            if self.cache is not None:
+                self.cache.put(key, snapshot.version, answer)
+                metrics.inc("legal_bot_response_cache_total", result="miss")
+        else:
+            metrics.inc("legal_bot_response_cache_total", result="hit")
+        return answer
+
+    def _follow_up(self, snapshot, query, language, context):
+        # Context answers depend on the session, so they bypass the shared cache
+        index = context.topic_index(snapshot)
+        if index is None or len(query) < MIN_QUERY_LENGTH:
+            return None
+        kind = follow_up_kind(query)
+        if kind is None:
+            return None
+        with metrics.timer("context"):
+            sections = snapshot.derived("sections", SectionIndex.from_snapshot)
+            # A keyword of another entry, or a cited section, means the question moved on
+            if any(match.index != index for match in snapshot.matcher.find_all(query)):
+                return None
+            if might_cite(query) and sections.query_keys(query):
+                return None
+            text = sections.section(index, kind) if kind != "response" else None
+        item = snapshot.patterns[index]
+        return Answer(
+            query, language, text or item["response"], True, "context", item["pattern"], index, snapshot.version
+        )
+
+    def _answer(self, snapshot, query, language, local=None):
+        if len(query) < MIN_QUERY_LENGTH:
+            return Answer(query, language, self.no_response(language), False, None, None, None, snapshot.version)
+
+        # Queries in the selected language are matched against its own keywords first
+        if local is not None:
+            with metrics.timer("localized"):
+                answer = self._localized(snapshot, local, query, language)
+            if answer is not None:
+                return answer
+
+        # A query citing a section, article or act gets just the paragraph citing it,
+        # preferring entries whose keywords also occur in the query
+        if might_cite(query):
+            with metrics.timer("sections"):
+                preferred = {match.index for match in snapshot.matcher.find_all(query)}
+                hit = snapshot.derived("sections", SectionIndex.from_snapshot).lookup(query, preferred)
+            if hit is not None:
+                item = snapshot.patterns[hit.index]
+                return Answer(query, language, hit.text, True, "section", item["pattern"], hit.index, snapshot.version)
+
+        # Find all matching patterns in one pass and take the longest / most specific one
+        with metrics.timer("match"):
+            match = snapshot.matcher.best(query)
+        if match is not None:
+            return self._found(snapshot, query, language, match.index, "pattern")
+
+        # Retry with misspelled words corrected against the keyword vocabulary
+        with metrics.timer("fuzzy"):
+            corrected, corrections = snapshot.derived("fuzzy", FuzzyIndex.from_snapshot).correct(query)
+            match = snapshot.matcher.best(corrected) if corrections else None
+        if match is not None:
+            metrics.record_corrections(query, corrections)
+            return self._found(snapshot, query, language, match.index, "fuzzy", tuple(corrections))
+
+        # No keyword matched: fall back to the offline semantic index, if it is built
+        if self.semantic:
+            with metrics.timer("semantic"):
+                index = semantic_lookup(snapshot, query)
+            if index is not None:
+                return self._found(snapshot, query, language, index, "semantic")
+
+        return Answer(query, language, self.no_response(language), False, None, None, None, snapshot.version)
+
+    def _localized(self, snapshot, local, query, language):
+        match = local.matcher.best(normalize_unicode(query))
+        if match is None:
+            return None
+        item = local.patterns[match.index]
+        # "ref" names an English keyword; its entry supplies the index for
+        # metrics and the response when the localized entry has none
+        english = snapshot.matcher.best(normalize_text(item.get("ref", "")))
+        index = english.index if english is not None else None
+        response = item.get("response")
+        if not response:
+            if index is None:
+                return None
+            response = snapshot.patterns[index]["response"]
+        return Answer(query, language, response, True, "localized", item["pattern"], index, snapshot.version)
+
+    def _found(self, snapshot, query, language, index, source, corrections=()):
+        item = snapshot.patterns[index]
+        return Answer(
+            query, language, item["response"], True, source, item["pattern"], index, snapshot.version, corrections
+        )
+
+
+_engines = {}
+
+
+def get_engine(path=None):
+    """Return a process-wide ResponseEngine, with a shared response cache, for the given pattern file."""
+    store = get_pattern_store(path) if path else get_pattern_store()
+    engine = _engines.get(store.path)
+    if engine is None or engine.store is not store:
+        engine = _engines[store.path] = ResponseEngine(store, cache=ResponseCache())
+    return engine
@@ -0,0 +1,172 @@
+"""Typo-tolerant correction of query words against the pattern vocabulary.
+
+A SymSpell-style deletion dictionary is built once per pattern-file version
+from the words of every keyword. Correcting a word only generates its own
+deletions and looks them up, so the cost does not grow with the number of
+patterns.
+
+Like SymSpell, a general English frequency list (dictionaries/, MIT licensed,
+from SymSpell) marks valid words, so "abortion" or "contact" are never
+rewritten into the keywords "adoption" or "contract".
+"""
+import os
+import re
+import threading
+from collections import Counter, namedtuple
+
+import metrics
+from matcher import split_pattern
+
+MAX_DISTANCE = 2
+
+ENGLISH_WORDS_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "dictionaries", "frequency_dictionary_en_82_765.txt"
+)
+
+# Only deletions of the first PREFIX_LENGTH characters are indexed (as in
+# SymSpell); candidates are then verified against the whole word. This keeps
+# the dictionary small for long keywords without missing any correction.
+PREFIX_LENGTH = 7
+
+# A word of the query replaced by a keyword word, kept for auditing
+Correction = namedtuple("Correction", ["original", "corrected", "distance"])
+
+_WORD = re.compile(r"\w+")
+
+_english_words = {}
+_english_lock = threading.Lock()
+
+
+def allowed_distance(word):
+    """Edits tolerated for a word of this length (short words are too ambiguous)."""
+    if len(word) < 5:
+        return 0
+    if len(word) < 10:
+        return 1
+    return MAX_DISTANCE
+
+
+def english_words(path=ENGLISH_WORDS_FILE):
+    """Words of an English frequency list ("word count" per line) long enough to be corrected.
+
+    Loaded once per process and shared by every FuzzyIndex. A missing file
+    is logged and leaves only the pattern vocabulary as known words.
+    """
+    words = _english_words.get(path)
+    if words is None:
+        with _english_lock:
+            words = _english_words.get(path)
+            if words is None:
+                try:
+                    with open(path, "r", encoding="utf-8") as file:
+                        words = frozenset(
+                            word for word in (line.split(" ", 1)[0] for line in file) if allowed_distance(word)
+                        )
+                except OSError as error:
+                    metrics.record_error("fuzzy_dictionary", error)
+                    words = frozenset()
+                _english_words[path] = words
+    return words
+
+
+def deletes(word, distance):
+    """All strings obtained by deleting up to `distance` characters from `word`."""
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance between a and b, or limit + 1 if it exceeds `limit`.
+
+    Only the diagonal band of width 2 * limit + 1 is computed, since any cell
+    outside it already costs more than `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    previous2 = None
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        char = a[i - 1]
+        for j in range(low, high + 1):
+            value = previous[j - 1] + (char != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if i > 1 and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1] and previous2[j - 2] + 1 < value:
+                value = previous2[j - 2] + 1
+            current[j] = value
+        if min(current[low - 1:high + 1]) > limit:
+            return over
+        previous2, previous = previous, current
+    return min(previous[-1], over)
+
+
+class FuzzyIndex:
+    """Deletion dictionary mapping misspelled words to keyword words.
+
+    Words that occur anywhere in the patterns or responses, or in the English
+    word list, count as correctly spelled and are never rewritten, which keeps
+    ordinary words such as "rate" from being "corrected" into a keyword.
+    """
+
+    def __init__(self, patterns, dictionary=None):
+        self.english = english_words() if dictionary is None else dictionary
+        self.frequency = Counter()
+        self.known = set()
+        for item in patterns:
+            for keyword in split_pattern(item.get("pattern", "")):
+                self.frequency.update(_WORD.findall(keyword))
+            self.known.update(_WORD.findall(item.get("response", "").lower()))
+        self.known.update(self.frequency)
+
+        self.dictionary = {}
+        for word in self.frequency:
+            for deletion in deletes(word[:PREFIX_LENGTH], allowed_distance(word)):
+                self.dictionary.setdefault(deletion, set()).add(word)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls(snapshot.patterns)
+
+    def correct_word(self, word):
+        """Return a Correction for a misspelled word, or None if it is known or has no close keyword."""
+        distance = allowed_distance(word)
+        if distance == 0 or word in self.known or word in self.english:
+            return None
+
+        candidates = set()
+        for deletion in deletes(word[:PREFIX_LENGTH], distance):
+            candidates |= self.dictionary.get(deletion, set())
+
+        best = None
+        for candidate in candidates:
+            found = edit_distance(word, candidate, distance)
+            if found <= distance:
+                rank = (found, -self.frequency[candidate], candidate)
+                if best is None or rank < best[0]:
+                    best = (rank, Correction(word, candidate, found))
+        return best[1] if best else None
+
+    def correct(self, query):
+        """Return (corrected query, [Correction, ...]) for a normalized query."""
+        corrections = []
+
+        def _replace(found):
+            correction = self.correct_word(found.group(0))
+            if correction is None:
+                return found.group(0)
+            corrections.append(correction)
+            return correction.corrected
+
+        corrected = _WORD.sub(_replace, query)
+        return corrected, corrections
@@ -0,0 +1,88 @@
+import json
+import os
+import time
+
+from lazy_imports import lazy_import
+
+COLUMNS = ["user_query", "assistant_response"]
+
+
+class Interaction:
+    """One chat turn. Slotted so a long history costs two references per turn."""
+
+    __slots__ = ("user_query", "assistant_response", "timestamp")
+
+    def __init__(self, user_query, assistant_response, timestamp=None):
+        self.user_query = user_query
+        self.assistant_response = assistant_response
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    def to_dict(self):
+        return {
+            "user_query": self.user_query,
+            "assistant_response": self.assistant_response,
+            "timestamp": self.timestamp,
+        }
+
+
+class InteractionLog:
+    """Append-only per-session interaction history.
+
+    Appending is O(1); a DataFrame is only built when the history is viewed.
+    With `spill_path` set, every turn is also appended to a JSONL file and only
+    the newest `max_in_memory` turns stay in RAM, so long-running sessions
+    keep bounded memory while the full history remains on disk.
+    """
+
+    def __init__(self, spill_path=None, max_in_memory=200):
+        self.spill_path = spill_path
+        self.max_in_memory = max_in_memory
+        self._records = []
+        self._spilled = 0
+
+    def append(self, user_query, assistant_response):
+        record = Interaction(user_query, assistant_response)
+        self._records.append(record)
+        if self.spill_path:
+            with open(self.spill_path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+            if len(self._records) > self.max_in_memory:
+                # The dropped records are already on disk
+                drop = len(self._records) - self.max_in_memory
+                del self._records[:drop]
+                self._spilled += drop
+        return record
+
+    def __len__(self):
+        return self._spilled + len(self._records)
+
+    def __iter__(self):
+        return self.since(0)
+
+    def since(self, start):
+        """Iterate over the turns from position `start` onwards."""
+        if start < self._spilled:
+            with open(self.spill_path, "r", encoding="utf-8") as file:
+                for line_number, line in enumerate(file):
+                    if line_number >= self._spilled:
+                        break
+                    if line_number >= start:
+                        row = json.loads(line)
+                        yield Interaction(row["user_query"], row["assistant_response"], row.get("timestamp"))
+        yield from self._records[max(start - self._spilled, 0):]
+
+    def to_dataframe(self):
+        """Build the pandas DataFrame shown by "View History"."""
+        pd = lazy_import("pandas")
+        return pd.DataFrame(
+            [(record.user_query, record.assistant_response) for record in self], columns=COLUMNS
+        )
+
+
+def session_spill_path(session_id, log_dir=None):
+    """JSONL spill file for a session, or None when LEGAL_BOT_LOG_DIR is not set."""
+    log_dir = log_dir or os.environ.get("LEGAL_BOT_LOG_DIR")
+    if not log_dir:
+        return None
+    os.makedirs(log_dir, exist_ok=True)
+    return os.path.join(log_dir, f"interactions-{session_id}.jsonl")
@@ -0,0 +1,26 @@
+"""On-demand imports for the heavy optional subsystems (TTS, speech recognition, PDF, pandas, embeddings).
+
+The text chat path never needs these, so they are imported on first use and
+the time each import took is recorded in IMPORT_TIMES.
+"""
+import importlib
+import sys
+import threading
+import time
+
+# Module name -> seconds its first import took in this process
+IMPORT_TIMES = {}
+
+_lock = threading.Lock()
+
+
+def lazy_import(name):
+    """Import `name` (once) and record how long the import took."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with _lock:
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMES.setdefault(name, time.perf_counter() - started)
+    return module
@@ -0,0 +1,162 @@
+import re
+import unicodedata
+from collections import deque, namedtuple
+
+# A single keyword hit inside a query: character span, the keyword and the
+# index of the legal_patterns.json entry it belongs to.
+Match = namedtuple("Match", ["start", "end", "keyword", "index"])
+
+
+# Word characters for script-aware tokenization. Python's \w does not cover the
+# combining vowel signs and viramas of Indic scripts (it would split "दहेज" into
+# "दह" and "ज"), so the Devanagari..Malayalam blocks are added, minus the
+# danda punctuation marks, along with the generic combining diacritics.
+_SCRIPT_WORD = re.compile(r"(?:[^\W_]|[\u0300-\u036f\u0900-\u0963\u0966-\u0d7f])+")
+# Zero-width (non-)joiners only change glyph shaping and are typed inconsistently
+_ZERO_WIDTH = dict.fromkeys(map(ord, "\u200c\u200d\u200b\ufeff"))
+# Malayalam chillu letters are still often typed as consonant + virama + ZWJ;
+# map those sequences to the atomic chillu code points before dropping ZWJ
+_MALAYALAM_CHILLU = re.compile("([\u0d23\u0d28\u0d30\u0d32\u0d33\u0d15])\u0d4d\u200d")
+_CHILLU = {"\u0d23": "\u0d7a", "\u0d28": "\u0d7b", "\u0d30": "\u0d7c", "\u0d32": "\u0d7d", "\u0d33": "\u0d7e", "\u0d15": "\u0d7f"}
+
+
+def normalize_text(text):
+    """Lowercase the text and collapse runs of whitespace to single spaces."""
+    return " ".join(text.lower().split())
+
+
+def normalize_unicode(text):
+    """NFC-normalize and casefold the text, keeping only its words separated by single spaces."""
+    text = unicodedata.normalize("NFC", text)
+    text = _MALAYALAM_CHILLU.sub(lambda found: _CHILLU[found.group(1)], text)
+    text = text.translate(_ZERO_WIDTH).casefold()
+    return " ".join(_SCRIPT_WORD.findall(text))
+
+
+def split_pattern(pattern, normalize=normalize_text):
+    """Split a pattern entry into its normalized keywords.
+
+    Entries may list alternatives separated by '|' (e.g. "blackmail|extortion").
+    """
+    keywords = []
+    for part in pattern.split("|"):
+        keyword = normalize(part)
+        if keyword and keyword not in keywords:
+            keywords.append(keyword)
+    return keywords
+
+
+class PatternMatcher:
+    """Aho-Corasick automaton over the normalized keywords of every pattern.
+
+    The automaton is built once and then finds every keyword occurring in a
+    query with a single pass over the query, independent of the number of
+    patterns. The best match is chosen by a fixed rule instead of file order:
+
+    1. the longest matched keyword wins (so "tax evasion" beats "tax"),
+    2. then the entry with the most distinct keywords found in the query,
+    3. between entries that share their keywords, the one whose response
+       contains the most query words the others' responses do not,
+    4. then the entry that appears first in the pattern file.
+
+    `shadowed` lists the entries whose every keyword also belongs to an
+    earlier entry; only rule 3 can return them.
+    """
+
+    def __init__(self, patterns, normalize=normalize_text):
+        # State 0 is the root. Each state has a goto table, a failure link and
+        # the (keyword, index) pairs that end in it (including via fail links).
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self.keyword_count = 0
+
+        owners = {}
+        keywords = []
+        for index, item in enumerate(patterns):
+            keywords.append(split_pattern(item.get("pattern", ""), normalize))
+            for keyword in keywords[index]:
+                self._add(keyword, index)
+                owners.setdefault(keyword, []).append(index)
+        self._build_failure_links()
+
+        # Only entries sharing a keyword need their response words to be told apart
+        shared = sorted({index for indices in owners.values() if len(indices) > 1 for index in indices})
+        self._content = {
+            index: frozenset(_SCRIPT_WORD.findall(normalize(patterns[index].get("response", "")))) for index in shared
+        }
+        self.shadowed = [
+            index
+            for index in shared
+            if keywords[index] and all(owners[keyword][0] != index for keyword in keywords[index])
+        ]
+
+    def _add(self, keyword, index):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((keyword, index))
+        self.keyword_count += 1
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def __len__(self):
+        return self.keyword_count
+
+    def find_all(self, query):
+        """Return every keyword match in the query, normalized the same way as the keywords."""
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        state = 0
+        for position, char in enumerate(query):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword, index in output[state]:
+                matches.append(Match(position - len(keyword) + 1, position + 1, keyword, index))
+        return matches
+
+    def best(self, query):
+        """Return the winning Match for the query, or None if nothing matches."""
+        matches = self.find_all(query)
+        if not matches:
+            return None
+
+        distinct = {}
+        for match in matches:
+            distinct.setdefault(match.index, set()).add(match.keyword)
+
+        def rank(match):
+            return -len(match.keyword), -len(distinct[match.index])
+
+        top = min(rank(match) for match in matches)
+        tied = sorted({match.index for match in matches if rank(match) == top})
+        winner = tied[0]
+        if len(tied) > 1 and all(index in self._content for index in tied):
+            overlap = self._content_overlap(query, tied)
+            winner = min(tied, key=lambda index: (-overlap[index], index))
+        return next(match for match in matches if match.index == winner and rank(match) == top)
+
+    def _content_overlap(self, query, indices):
+        # Words every tied response contains (e.g. "law") cannot tell them apart
+        words = set(_SCRIPT_WORD.findall(query))
+        common = frozenset.intersection(*(self._content[index] for index in indices))
+        return {index: len((words & self._content[index]) - common) for index in indices}
@@ -0,0 +1,283 @@
+"""In-process instrumentation: stage timers, counters and an optional sampling profiler.
+
+Every stage of the chat pipeline records its latency with `timer(stage)`,
+and the engine counts answers per language and hits per pattern. The data
+can be exported in the Prometheus text format (`render_prometheus()`, served
+by api_server.py at GET /metrics) or appended periodically to a JSONL file:
+
+    LEGAL_BOT_METRICS_JSONL=metrics.jsonl streamlit run app.py
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import contextmanager
+
+logger = logging.getLogger("legal_bot")
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "legal_bot_stage_seconds": ("histogram", "Latency of each chat pipeline stage."),
+    "legal_bot_answers_total": ("counter", "Answered queries by language and source (none = no_response)."),
+    "legal_bot_pattern_hits_total": ("counter", "Queries answered by each pattern entry, by language."),
+    "legal_bot_errors_total": ("counter", "Errors by pipeline stage."),
+    "legal_bot_response_cache_total": ("counter", "Response cache lookups by result."),
+    "legal_bot_fuzzy_corrections_total": ("counter", "Misspelled words corrected for fuzzy matches."),
+}
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Registry:
+    """Thread-safe store of labelled counters and latency histograms."""
+
+    def __init__(self, recent_misses=100):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self.recent_misses = deque(maxlen=recent_misses)
+        self.recent_corrections = deque(maxlen=recent_misses)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("legal_bot_stage_seconds", time.perf_counter() - started, stage=stage, **labels)
+
+    def record_answer(self, answer, snapshot):
+        """Count an engine Answer: per language/source, per pattern, and remember misses.
+
+        Pattern hits are labelled with the entry of `snapshot` (the English
+        patterns) the answer came from, so a localized answer counts against
+        the same series as the English one, told apart by its language.
+        """
+        self.inc("legal_bot_answers_total", language=answer.language, source=answer.source or "none")
+        if not answer.matched:
+            self.recent_misses.append(answer.query)
+        elif answer.index is not None:
+            pattern = snapshot.patterns[answer.index]["pattern"].strip()
+            self.inc("legal_bot_pattern_hits_total", index=str(answer.index), pattern=pattern, language=answer.language)
+
+    def record_corrections(self, query, corrections):
+        """Remember the typo corrections behind a fuzzy match so false positives can be audited."""
+        self.inc("legal_bot_fuzzy_corrections_total", len(corrections))
+        self.recent_corrections.append(
+            {"query": query, "corrections": [[c.original, c.corrected, c.distance] for c in corrections]}
+        )
+        logger.info("fuzzy match for %r: %s", query, corrections)
+
+    def record_error(self, stage, error):
+        """Log an error and count it against its stage."""
+        logger.error("%s failed: %s", stage, error)
+        self.inc("legal_bot_errors_total", stage=stage)
+
+    def pattern_hits(self):
+        """Map pattern index -> hit count, over all languages."""
+        hits = Counter()
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                if name == "legal_bot_pattern_hits_total":
+                    hits[int(dict(labels)["index"])] += value
+        return hits
+
+    def snapshot(self):
+        """Plain-dict copy of every metric, as written to the JSONL sink."""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.total,
+                    "buckets": dict(zip([str(bound) for bound in BUCKETS] + ["+Inf"], histogram.counts)),
+                }
+                for (name, labels), histogram in self._histograms.items()
+            ]
+        return {
+            "counters": counters,
+            "histograms": histograms,
+            "recent_misses": list(self.recent_misses),
+            "recent_corrections": list(self.recent_corrections),
+        }
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+
+        described = set()
+        for (name, labels), value in counters:
+            _describe(lines, described, name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            _describe(lines, described, name)
+            cumulative = 0
+            for bound, count in zip([repr(bound) for bound in BUCKETS] + ["+Inf"], histogram.counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {histogram.total}")
+            lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _describe(lines, described, name):
+    if name in described:
+        return
+    described.add(name)
+    kind, text = HELP.get(name, ("untyped", name))
+    lines.append(f"# HELP {name} {text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+class JsonlSink:
+    """Background thread appending a metrics snapshot to a JSONL file every `interval` seconds."""
+
+    def __init__(self, registry, path, interval=60.0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-jsonl", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        record = dict(self.registry.snapshot(), ts=time.time(), pid=os.getpid())
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack at a fixed interval while active.
+
+    Used per request: wrap the work in `with SamplingProfiler() as profile:`
+    and read `profile.top()` or `profile.collapsed()` (flamegraph input).
+    """
+
+    def __init__(self, interval=0.001, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def top(self, limit=10):
+        """Most frequently sampled leaf functions as (function, samples) pairs."""
+        leaves = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+REGISTRY = Registry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+record_answer = REGISTRY.record_answer
+record_error = REGISTRY.record_error
+record_corrections = REGISTRY.record_corrections
+render_prometheus = REGISTRY.render_prometheus
+
+_sink = None
+_sink_lock = threading.Lock()
+
+
+def start_jsonl_sink_from_env():
+    """Start the JSONL sink once per process when LEGAL_BOT_METRICS_JSONL is set."""
+    global _sink
+    path = os.environ.get("LEGAL_BOT_METRICS_JSONL")
+    if not path:
+        return None
+    with _sink_lock:
+        if _sink is None:
+            interval = float(os.environ.get("LEGAL_BOT_METRICS_INTERVAL", "60"))
+            _sink = JsonlSink(REGISTRY, path, interval).start()
+    return _sink
+
+
+def unhit_patterns(snapshot):
+    """Pattern entries in the snapshot that no query has matched in this process."""
+    hits = REGISTRY.pattern_hits()
+    return [(index, item["pattern"]) for index, item in enumerate(snapshot.patterns) if index not in hits]
@@ -0,0 +1,219 @@
+"""Compact, memory-mapped binary form of legal_patterns.json.
+
+The JSON file is compiled ahead of time into a single read-only file that
+every process maps instead of parsing. Workers forked from one server, and
+separate processes on the same host, share its pages through the page cache,
+and a response is only decoded when a match actually returns it.
+
+Build (or refresh) it next to the JSON file with:
+
+    python pattern_db.py --patterns legal_patterns.json
+
+PatternStore opens legal_patterns.bin instead of parsing the JSON whenever the
+sha256 recorded in its header matches the JSON file; a stale or unreadable
+file is ignored. To check that, the store still reads and hashes the whole
+JSON file on every (re)load, so what the compiled file saves is the JSON parse
+and the memory held by responses, not startup time: a full store start is
+dominated by that read and hash plus building the keyword matcher, and stays
+about the same (see benchmarks/bench_pattern_db.py).
+
+Layout (little-endian):
+
+    header          magic, entry count, string count, sha256 of the source
+                    JSON and the offsets of the three sections below
+    entry table     per entry: pattern string id (u32), response offset (u64)
+                    and response length (u32)
+    string table    per interned pattern string: offset and length (u32 each)
+                    into the string blob, followed by the blob itself
+    response blob   UTF-8 responses; identical responses are stored once
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping, Sequence
+
+MAGIC = b"LLPDB001"
+HEADER = struct.Struct("<8sII32sQQQ")
+ENTRY = struct.Struct("<IQI")
+STRING = struct.Struct("<II")
+
+# Only these fields are compiled; files with other fields stay JSON-only
+FIELDS = ("pattern", "response")
+
+
+def pattern_db_path(patterns_path):
+    """Path of the compiled database for a pattern file (legal_patterns.json -> legal_patterns.bin)."""
+    return os.path.splitext(patterns_path)[0] + ".bin"
+
+
+def write_pattern_db(patterns, path, digest):
+    """Compile a list of pattern entries into `path`, replacing it atomically."""
+    strings = {}
+    responses = {}
+    entries = []
+    response_blob = bytearray()
+    for item in patterns:
+        extra = set(item) - set(FIELDS)
+        if extra:
+            raise ValueError(f"cannot compile pattern entries with fields {sorted(extra)}")
+        string_id = strings.setdefault(item.get("pattern", ""), len(strings))
+        response = item.get("response", "")
+        if response not in responses:
+            encoded = response.encode("utf-8")
+            responses[response] = (len(response_blob), len(encoded))
+            response_blob += encoded
+        entries.append((string_id,) + responses[response])
+
+    string_table = bytearray()
+    string_blob = bytearray()
+    for string in strings:
+        encoded = string.encode("utf-8")
+        string_table += STRING.pack(len(string_blob), len(encoded))
+        string_blob += encoded
+
+    strings_offset = HEADER.size + ENTRY.size * len(entries)
+    string_blob_offset = strings_offset + len(string_table)
+    response_blob_offset = string_blob_offset + len(string_blob)
+    header = HEADER.pack(
+        MAGIC,
+        len(entries),
+        len(strings),
+        bytes.fromhex(digest),
+        strings_offset,
+        string_blob_offset,
+        response_blob_offset,
+    )
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(header)
+        for entry in entries:
+            file.write(ENTRY.pack(*entry))
+        file.write(string_table)
+        file.write(string_blob)
+        file.write(response_blob)
+    # Processes that still map the old file keep their pages; new ones see the new file
+    os.replace(temporary, path)
+
+
+class PatternEntry(Mapping):
+    """One entry of a PatternDB, read-only and decoded field by field on access."""
+
+    __slots__ = ("_db", "_index")
+
+    def __init__(self, db, index):
+        self._db = db
+        self._index = index
+
+    def __getitem__(self, key):
+        if key == "pattern":
+            return self._db.pattern(self._index)
+        if key == "response":
+            return self._db.response(self._index)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return f"PatternEntry({self._index}, {self._db.pattern(self._index)!r})"
+
+
+class PatternDB(Sequence):
+    """Read-only list of pattern entries backed by a memory-mapped compiled file.
+
+    Pattern strings are decoded once each (the matcher needs all of them);
+    responses are decoded straight from the mapping every time they are read
+    and are never kept.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path} is not a compiled pattern database")
+        (
+            magic,
+            self._count,
+            string_count,
+            digest,
+            self._strings_offset,
+            self._string_blob_offset,
+            self._response_blob_offset,
+        ) = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compiled pattern database")
+        if (
+            self._strings_offset != HEADER.size + ENTRY.size * self._count
+            or self._string_blob_offset != self._strings_offset + STRING.size * string_count
+            or not self._string_blob_offset <= self._response_blob_offset <= len(self._map)
+        ):
+            raise ValueError(f"{path} is truncated or corrupt")
+        self.digest = digest.hex()
+        self._view = memoryview(self._map)
+        self._strings = [None] * string_count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("pattern index out of range")
+        return PatternEntry(self, index)
+
+    def _entry(self, index):
+        return ENTRY.unpack_from(self._map, HEADER.size + ENTRY.size * index)
+
+    def pattern(self, index):
+        string_id = self._entry(index)[0]
+        string = self._strings[string_id]
+        if string is None:
+            offset, length = STRING.unpack_from(self._map, self._strings_offset + STRING.size * string_id)
+            start = self._string_blob_offset + offset
+            string = self._strings[string_id] = str(self._view[start:start + length], "utf-8")
+        return string
+
+    def response(self, index):
+        _, offset, length = self._entry(index)
+        start = self._response_blob_offset + offset
+        return str(self._view[start:start + length], "utf-8")
+
+
+def open_pattern_db(path, digest=None):
+    """Open the compiled database at `path`, or return None if it is missing or was built from other JSON."""
+    try:
+        db = PatternDB(path)
+    except FileNotFoundError:
+        return None
+    if digest is not None and db.digest != digest:
+        return None
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile legal_patterns.json into a memory-mappable database")
+    parser.add_argument("--patterns", default="legal_patterns.json")
+    parser.add_argument("-o", "--output", help="output file (default: the pattern file with a .bin suffix)")
+    args = parser.parse_args()
+
+    with open(args.patterns, "rb") as file:
+        raw = file.read()
+    output = args.output or pattern_db_path(args.patterns)
+    patterns = json.loads(raw.decode("utf-8"))
+    write_pattern_db(patterns, output, hashlib.sha256(raw).hexdigest())
+    print(f"Compiled {len(patterns)} patterns into {output} ({os.path.getsize(output)} bytes).")
+
+
+if __name__ == "__main__":
+    main()
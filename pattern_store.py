@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import metrics
+from matcher import PatternMatcher, normalize_text
+from pattern_db import PatternDB, open_pattern_db, pattern_db_path
+
+DEFAULT_PATTERNS_FILE = "legal_patterns.json"
+
+
+class PatternSnapshot:
+    """An immutable, fully built version of the pattern file.
+
+    Queries hold on to the snapshot they started with, so a reload that swaps
+    in a newer version never changes the data under a query already running.
+    """
+
+    def __init__(
+        self, patterns, version, digest=None, mtime=None, size=None, load_seconds=0.0, error=None,
+        normalize=normalize_text,
+    ):
+        self.patterns = patterns
+        self.normalize = normalize
+        self.matcher = PatternMatcher(patterns, normalize)
+        self.version = version
+        self.digest = digest
+        self.mtime = mtime
+        self.size = size
+        self.loaded_at = time.time()
+        self.load_seconds = load_seconds
+        self.error = error
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+
+    def derived(self, name, builder):
+        """Return an index derived from this snapshot, building it on first use.
+
+        `builder(snapshot)` runs at most once per snapshot, so derived indexes
+        are rebuilt only when the pattern file actually changes.
+        """
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+            return self._derived[name]
+
+    def forget(self, name):
+        """Drop a derived index so the next `derived()` call builds it again."""
+        with self._derived_lock:
+            self._derived.pop(name, None)
+
+
+class PatternStore:
+    """Process-wide holder of the current PatternSnapshot for one pattern file.
+
+    The file is parsed once and reused by every session. `snapshot()` does a
+    cheap `os.stat` at most every `check_interval` seconds; the file is only
+    re-read when its mtime or size changed, and only re-parsed when the
+    content hash changed too. A new snapshot is built off to the side and then
+    swapped in with a single reference assignment. If a compiled database
+    (see pattern_db) built from the same content sits next to the file, it is
+    memory-mapped instead of parsed.
+
+    `normalize` is applied to keywords (and must be applied to queries) by the
+    snapshot's matcher; localized stores use `normalize_unicode`.
+    """
+
+    def __init__(self, path=DEFAULT_PATTERNS_FILE, check_interval=1.0, normalize=normalize_text):
+        self.path = path
+        self.check_interval = check_interval
+        self.normalize = normalize
+        self._reload_lock = threading.Lock()
+        self._last_check = 0.0
+        self._stat_key = None
+        self._checks = 0
+        self._reloads = 0
+        self._last_error = None
+        self._snapshot = PatternSnapshot([], version=0, normalize=normalize)
+        self.reload(force=True)
+
+    def snapshot(self):
+        """Return the current snapshot, reloading first if the file changed."""
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self.reload()
+        return self._snapshot
+
+    def reload(self, force=False):
+        """Reload the pattern file if it changed on disk (or always when forced).
+
+        If another thread is already reloading, this returns immediately and
+        the caller keeps using the current snapshot.
+        """
+        if not self._reload_lock.acquire(blocking=force):
+            return self._snapshot
+        try:
+            self._last_check = time.monotonic()
+            self._checks += 1
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return self._fail("Patterns file not found.")
+
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+            if stat_key == self._stat_key and not force:
+                return self._snapshot
+
+            started = time.perf_counter()
+            with metrics.timer("load_patterns"):
+                with open(self.path, "rb") as file:
+                    raw = file.read()
+                digest = hashlib.sha256(raw).hexdigest()
+                self._stat_key = stat_key
+                if digest == self._snapshot.digest and not force:
+                    return self._snapshot
+
+                patterns = self._open_compiled(digest)
+                if patterns is None:
+                    try:
+                        patterns = json.loads(raw.decode("utf-8"))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        return self._fail("Error decoding the patterns file.")
+                    if not isinstance(patterns, list):
+                        return self._fail("Error decoding the patterns file.")
+
+                snapshot = PatternSnapshot(
+                    patterns,
+                    version=self._snapshot.version + 1,
+                    digest=digest,
+                    mtime=stat.st_mtime,
+                    size=stat.st_size,
+                    load_seconds=time.perf_counter() - started,
+                    normalize=self.normalize,
+                )
+            if snapshot.matcher.shadowed:
+                metrics.logger.warning(
+                    "%s: %d entries repeat only keywords of earlier entries and are chosen by response text "
+                    "alone (first: %s); see stats()['shadowed']",
+                    self.path,
+                    len(snapshot.matcher.shadowed),
+                    snapshot.matcher.shadowed[:20],
+                )
+            self._snapshot = snapshot
+            self._reloads += 1
+            self._last_error = None
+            return snapshot
+        finally:
+            self._reload_lock.release()
+
+    def _open_compiled(self, digest):
+        # Map the compiled database instead of parsing when it was built from this exact JSON
+        try:
+            return open_pattern_db(pattern_db_path(self.path), digest)
+        except (OSError, ValueError) as error:
+            metrics.record_error("pattern_db", error)
+            return None
+
+    def _fail(self, error):
+        # Keep serving the last good version; only an empty store reports the error
+        metrics.record_error("load_patterns", error)
+        self._last_error = error
+        if not self._snapshot.patterns:
+            self._snapshot.error = error
+        return self._snapshot
+
+    def stats(self):
+        """Return version and load-time statistics for the current snapshot."""
+        snapshot = self._snapshot
+        return {
+            "path": os.path.abspath(self.path),
+            "version": snapshot.version,
+            "digest": snapshot.digest,
+            "patterns": len(snapshot.patterns),
+            "compiled": isinstance(snapshot.patterns, PatternDB),
+            "keywords": len(snapshot.matcher),
+            "shadowed": [
+                {"index": index, "pattern": snapshot.patterns[index]["pattern"]} for index in snapshot.matcher.shadowed
+            ],
+            "loaded_at": snapshot.loaded_at,
+            "load_seconds": snapshot.load_seconds,
+            "reloads": self._reloads,
+            "checks": self._checks,
+            "last_error": self._last_error,
+        }
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_pattern_store(path=DEFAULT_PATTERNS_FILE, normalize=normalize_text):
+    """Return the shared PatternStore for `path`, creating it on first use.
+
+    Streamlit re-executes app.py on every rerun but imports this module only
+    once per process, so the store survives reruns and is shared by sessions.
+    `normalize` only applies when the store is created.
+    """
+    key = os.path.abspath(path)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = _stores[key] = PatternStore(path, normalize=normalize)
+    return store
@@ -0,0 +1,206 @@
+import io
+import os
+import re
+import threading
+
+import metrics
+from lazy_imports import lazy_import
+
+# US letter, in points (reportlab.lib.pagesizes.letter)
+PAGE_WIDTH, PAGE_HEIGHT = 612.0, 792.0
+LEFT_MARGIN = 72
+RIGHT_MARGIN = 72
+TOP = 750
+BOTTOM = 50
+FONT = "Helvetica"
+BOLD_FONT = "Helvetica-Bold"
+FONT_SIZE = 11
+LINE_HEIGHT = 14
+TITLE = "Legal Laws Assistant - Chat History"
+
+# The standard PDF fonts only cover Latin text. Lines in an Indian script are
+# set in the first of these TrueType fonts that has glyphs for it (Noto, GNU
+# FreeFont and Nirmala UI all do); LEGAL_BOT_PDF_FONTS overrides the list with
+# os.pathsep-separated paths. Install uharfbuzz to shape conjuncts and vowel
+# signs, otherwise the characters are drawn one by one.
+UNICODE_FONTS = os.environ.get("LEGAL_BOT_PDF_FONTS", os.pathsep.join([
+    "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansTelugu-Regular.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansTamil-Regular.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansKannada-Regular.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansMalayalam-Regular.ttf",
+    "/usr/share/fonts/truetype/freefont/FreeSerif.ttf",
+    "/usr/share/fonts/gnu-free/FreeSerif.ttf",
+    "C:\\Windows\\Fonts\\Nirmala.ttf",
+])).split(os.pathsep)
+
+# Unicode blocks of the Indian scripts, 128 code points each from U+0900
+INDIC_SCRIPTS = ("Devanagari", "Bengali", "Gurmukhi", "Gujarati", "Oriya", "Tamil", "Telugu", "Kannada", "Malayalam")
+_INDIC_START = 0x0900
+_KA = 0x15  # offset of the letter KA in every one of those blocks
+
+# Finished pages are rendered and cached in segments of this many pages
+SEGMENT_PAGES = 20
+
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
+_HEADING = re.compile(r"^\*\*[^*]+\*\*:?$")
+
+
+_fonts_lock = threading.Lock()
+_loaded_fonts = {}  # path -> registered TTFont, or None if it could not be read
+_script_fonts = {}  # script -> registered font name, or None if no font covers it
+
+
+def line_script(text):
+    """The first Indian script used in a line of text, or None for Latin text."""
+    for char in text:
+        block = (ord(char) - _INDIC_START) >> 7
+        if 0 <= block < len(INDIC_SCRIPTS):
+            return INDIC_SCRIPTS[block]
+    return None
+
+
+def _load_font(path):
+    if path not in _loaded_fonts:
+        font = None
+        if os.path.exists(path):
+            ttfonts = lazy_import("reportlab.pdfbase.ttfonts")
+            try:
+                font = ttfonts.TTFont(os.path.splitext(os.path.basename(path))[0], path)
+            except (OSError, ttfonts.TTFError) as error:
+                metrics.record_error("pdf_font", error)
+            else:
+                lazy_import("reportlab.pdfbase.pdfmetrics").registerFont(font)
+        _loaded_fonts[path] = font
+    return _loaded_fonts[path]
+
+
+def script_font(script):
+    """Name of a registered TrueType font with glyphs for `script`, or None if UNICODE_FONTS has none."""
+    with _fonts_lock:
+        if script not in _script_fonts:
+            letter = _INDIC_START + (INDIC_SCRIPTS.index(script) << 7) + _KA
+            fonts = (_load_font(path) for path in UNICODE_FONTS)
+            found = next((font for font in fonts if font is not None and letter in font.face.charToGlyph), None)
+            if found is None:
+                metrics.logger.warning("no font for %s text in PDF exports; set LEGAL_BOT_PDF_FONTS", script)
+            _script_fonts[script] = found.fontName if found is not None else None
+        return _script_fonts[script]
+
+
+def line_font(font, text):
+    """The font to set a line in: `font`, or a Unicode font if the line is in an Indian script."""
+    script = line_script(text)
+    if script is None:
+        return font
+    return script_font(script) or font
+
+
+def markdown_lines(text):
+    """Split a markdown response into (font, indent, text) lines.
+
+    Handles the markdown used in legal_patterns.json: **bold** headings,
+    "- " bullet lists, [text](url) links and blank lines between paragraphs.
+    A blank line is returned as None.
+    """
+    lines = []
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            lines.append(None)
+            continue
+        line = _LINK.sub(r"\1 (\2)", line)
+        font = BOLD_FONT if _HEADING.match(line) else FONT
+        indent = 0
+        if line.startswith("- "):
+            line = "• " + line[2:]
+            indent = 12
+        lines.append((font, indent, line.replace("**", "")))
+    return lines
+
+
+class ChatPdfExporter:
+    """Incrementally laid out, cached PDF export of a session's chat history.
+
+    Only turns added since the last export are laid out. Pages that can no
+    longer change are rendered once, in segments of SEGMENT_PAGES, and kept as
+    PDF bytes; each export renders just the open tail page(s) and joins them to
+    the cached segments. Everything stays in memory, so no temp files are left
+    behind.
+    """
+
+    def __init__(self):
+        self._turns = 0
+        self._segments = []  # rendered PDF bytes for finished pages
+        self._pages = [[]]  # laid out, not yet rendered pages: lists of (font, x, y, text)
+        self._y = TOP
+        self._add(BOLD_FONT, LEFT_MARGIN, TITLE)
+        self._y -= LINE_HEIGHT
+
+    def _new_page(self):
+        self._pages.append([])
+        self._y = TOP
+
+    def _add(self, font, x, text):
+        if self._y < BOTTOM:
+            self._new_page()
+        self._pages[-1].append((font, x, self._y, text))
+        self._y -= LINE_HEIGHT
+
+    def _add_wrapped(self, font, indent, text):
+        font = line_font(font, text)
+        x = LEFT_MARGIN + indent
+        width = PAGE_WIDTH - RIGHT_MARGIN - x
+        simple_split = lazy_import("reportlab.lib.utils").simpleSplit
+        for piece in simple_split(text, font, FONT_SIZE, width) or [""]:
+            self._add(font, x, piece)
+
+    def _add_turn(self, user_query, assistant_response):
+        self._add_wrapped(BOLD_FONT, 0, "User:")
+        self._add_wrapped(FONT, 12, user_query)
+        self._add_wrapped(BOLD_FONT, 0, "Assistant:")
+        for line in markdown_lines(assistant_response):
+            if line is None:
+                self._y -= LINE_HEIGHT // 2
+            else:
+                font, indent, text = line
+                self._add_wrapped(font, 12 + indent, text)
+        self._y -= LINE_HEIGHT
+
+    def update(self, interaction_log):
+        """Lay out the turns added to the log since the previous call."""
+        for record in interaction_log.since(self._turns):
+            self._add_turn(record.user_query, record.assistant_response)
+            self._turns += 1
+
+        # Every page but the last is final; render full segments of them once
+        while len(self._pages) - 1 >= SEGMENT_PAGES:
+            self._segments.append(_render(self._pages[:SEGMENT_PAGES]))
+            del self._pages[:SEGMENT_PAGES]
+
+    def export(self, interaction_log):
+        """Return the PDF for the whole history as bytes."""
+        self.update(interaction_log)
+        tail = _render(self._pages)
+        if not self._segments:
+            return tail
+
+        writer = lazy_import("pypdf").PdfWriter()
+        for part in self._segments + [tail]:
+            writer.append(io.BytesIO(part))
+        output = io.BytesIO()
+        writer.write(output)
+        return output.getvalue()
+
+
+def _render(pages):
+    buffer = io.BytesIO()
+    c = lazy_import("reportlab.pdfgen.canvas").Canvas(buffer, pagesize=(PAGE_WIDTH, PAGE_HEIGHT))
+    for page in pages:
+        for font, x, y, text in page:
+            c.setFont(font, FONT_SIZE)
+            # Shaping only applies to the Unicode fonts (and needs uharfbuzz)
+            c.drawString(x, y, text, shaping=font not in (FONT, BOLD_FONT))
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
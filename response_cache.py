@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MAX_ENTRIES = int(os.environ.get("LEGAL_BOT_CACHE_SIZE", "4096"))
+TTL = float(os.environ.get("LEGAL_BOT_CACHE_TTL", "3600"))
+NEGATIVE_TTL = float(os.environ.get("LEGAL_BOT_CACHE_NEGATIVE_TTL", "120"))
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of engine Answers with TTL and negative caching.
+
+    Keys are (normalized query, language, localized pattern version).
+    Answers that fell through to no_response are cached too, with the shorter
+    `negative_ttl`, so repeated misses skip the semantic search without hiding
+    a semantic index that is built later. Every entry belongs to one pattern-store version; seeing a
+    new version empties the cache.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL, negative_ttl=NEGATIVE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        # Called with the lock held
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        """Return the cached Answer for `key` under pattern `version`, or None."""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            answer, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if answer.matched:
+                self.hits += 1
+            else:
+                self.negative_hits += 1
+            return answer
+
+    def put(self, key, version, answer):
+        ttl = self.ttl if answer.matched else self.negative_ttl
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (answer, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
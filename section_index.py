@@ -0,0 +1,204 @@
+"""Statute and section lookups over the structured parts of every response.
+
+Responses follow a loose layout: an overview with an inline **Punishment:**
+sentence, then paragraphs headed **Indian Penal Code (IPC) Sections:**,
+**Pros:**, **Cons:** and so on, citing "Section 376", "Article 326" or acts
+such as "Consumer Protection Act, 2019". The index maps every cited
+identifier to the paragraphs (or list items) citing it, so a query such as
+"section 376 punishment" or "what is IPC 498A" is answered with the relevant
+paragraph instead of the whole response.
+
+Only positions are kept in the index; the response text is re-read and split
+when a lookup returns, which keeps it small next to a memory-mapped pattern
+database.
+
+Section keys are not scoped to an act: "section 66" collects Section 66 of the
+IT Act and of any other statute alike (the pattern file itself lists IT Act
+sections under its IPC headings). An act named in the query only helps
+through the keyword preference of `SectionIndex.lookup`.
+"""
+import re
+from collections import namedtuple
+
+from matcher import PatternMatcher, normalize_text
+
+# One paragraph of a response. `kind` is "overview", "punishment" or the
+# lowercased heading ("pros", "cons", "ipc sections", ...).
+Section = namedtuple("Section", ["kind", "heading", "text"])
+
+# A lookup result: the cited identifier (e.g. "section 376"), the pattern
+# entry and the text to return for it.
+SectionHit = namedtuple("SectionHit", ["key", "index", "text"])
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_HEADING = re.compile(r"\*\*(?P<heading>[^*\n]+?):?\*\*:?\s*")
+_PUNISHMENT = re.compile(r"\*\*Punishment:\*\*")
+
+# "Section 376", "Sections 499-502", "Sections 415 and 420", "Article 326"
+_NUMBERED = re.compile(
+    r"\b(?P<kind>Section|Article)s?\s+(?P<numbers>\d+[A-Z]*(?:\s*(?:,|-|–|to|and)\s*\d+[A-Z]*)*)"
+)
+_NUMBER = re.compile(r"\d+[A-Z]*")
+_RANGE = re.compile(r"(\d+)\s*(?:-|–|to)\s*(\d+)")
+MAX_RANGE = 50
+# "Consumer Protection Act, 2019", "Juvenile Justice (Care and Protection of Children) Act"
+_ACT = re.compile(r"\b(?:[A-Z][\w()]*\s+)(?:(?:[A-Z(][\w()]*|of|and|for|from|to|with|on|the)\s+)*Act\b")
+
+# Query side, on normalized (lowercase) text: "section 376", "sec 498a", "u/s 302",
+# "ipc 498a", "498a ipc", "article 21"
+_QUERY_SECTION = re.compile(r"\b(?:sections?|sec|u/s|ipc)\.?\s*(\d+[a-z]*)\b|\b(\d+[a-z]*)\s+(?:of\s+)?(?:the\s+)?ipc\b")
+_QUERY_ARTICLE = re.compile(r"\b(?:articles?|art)\.?\s*(\d+[a-z]*)\b")
+_MIGHT_CITE = re.compile(r"\d|\bact\b")
+_WANTS_PUNISHMENT = re.compile(r"\b(?:punish\w*|penalt\w*|sentence\w*|jail|imprison\w*|fine)\b")
+
+
+def section_key(kind, number):
+    return f"{kind.lower()} {number.upper()}"
+
+
+def act_key(name):
+    """Normalized act name without a leading "the" (years are not part of the match)."""
+    name = normalize_text(name)
+    return name[4:] if name.startswith("the ") else name
+
+
+def might_cite(query):
+    """Cheap check that a normalized query could cite a section, article or act."""
+    return _MIGHT_CITE.search(query) is not None
+
+
+def parse_sections(response):
+    """Split a response into Sections: the overview, the punishment and each headed paragraph."""
+    sections = []
+    for number, paragraph in enumerate(_PARAGRAPH_BREAK.split(response.strip())):
+        if number == 0:
+            found = _PUNISHMENT.search(paragraph)
+            if found:
+                sections.append(Section("overview", None, paragraph[:found.start()].strip()))
+                sections.append(Section("punishment", "Punishment", paragraph[found.start():].strip()))
+                continue
+        heading = _HEADING.match(paragraph)
+        if heading:
+            name = heading.group("heading").strip()
+            kind = "ipc sections" if name.lower().startswith("indian penal code") else name.lower()
+            sections.append(Section(kind, name, paragraph))
+        else:
+            sections.append(Section("overview" if number == 0 else "text", None, paragraph))
+    return sections
+
+
+def citations(text):
+    """Every section/article key and act name cited in a piece of text."""
+    keys = []
+    for found in _NUMBERED.finditer(text):
+        kind, numbers = found.group("kind"), found.group("numbers")
+        for number in _NUMBER.findall(numbers):
+            keys.append(section_key(kind, number))
+        for start, end in _RANGE.findall(numbers):
+            if 0 < int(end) - int(start) <= MAX_RANGE:
+                keys.extend(section_key(kind, str(number)) for number in range(int(start) + 1, int(end)))
+    keys.extend(act_key(found.group(0)) for found in _ACT.finditer(text))
+    return keys
+
+
+def _list_item(lines, number):
+    # The line number if it is an item of a bulleted list, None for running text
+    line = lines[number].lstrip()
+    return number if line.startswith(("- ", "* ")) else None
+
+
+class SectionIndex:
+    """Hash index from cited identifiers to the paragraphs citing them.
+
+    `citations[key]` lists (entry index, paragraph number, line number or
+    None) in file order. Act names are also compiled into a PatternMatcher so
+    they can be found anywhere in a query with one pass.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = patterns
+        self.citations = {}
+        for index, item in enumerate(patterns):
+            for paragraph, section in enumerate(parse_sections(item.get("response", ""))):
+                lines = section.text.split("\n")
+                for line_number, line in enumerate(lines):
+                    for key in citations(line):
+                        positions = self.citations.setdefault(key, [])
+                        position = (index, paragraph, _list_item(lines, line_number))
+                        if position not in positions:
+                            positions.append(position)
+        # Two-letter names ("it act") read as ordinary words in a query, so only longer ones are matched
+        acts = [key for key in self.citations if key.endswith(" act") and len(key) >= len("xxx act")]
+        self._acts = acts
+        self._act_matcher = PatternMatcher([{"pattern": act} for act in acts])
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls(snapshot.patterns)
+
+    def __len__(self):
+        return len(self.citations)
+
+    def sections(self, index):
+        """Parsed Sections of one entry's response."""
+        return parse_sections(self.patterns[index]["response"])
+
+    def section(self, index, kind):
+        """Text of the first paragraph of `kind` in an entry's response, or None."""
+        for section in self.sections(index):
+            if section.kind == kind:
+                return section.text
+        return None
+
+    def query_keys(self, query):
+        """Identifiers cited by a normalized query, most specific (numbered) first."""
+        if not might_cite(query):
+            return []
+        keys = []
+        for found in _QUERY_SECTION.finditer(query):
+            keys.append(section_key("section", found.group(1) or found.group(2)))
+        keys.extend(section_key("article", number) for number in _QUERY_ARTICLE.findall(query))
+        for match in self._act_matcher.find_all(query):
+            before = query[match.start - 1:match.start]
+            after = query[match.end:match.end + 1]
+            if not before.isalnum() and not after.isalnum():
+                keys.append(self._acts[match.index])
+        return [key for key in dict.fromkeys(keys) if key in self.citations]
+
+    def text(self, position, query=""):
+        """Text for a citation position, followed by the punishment paragraph if the query asks for it."""
+        index, paragraph, line = position
+        sections = self.sections(index)
+        section = sections[paragraph]
+        if line is None:
+            text = section.text
+        else:
+            # Just the list item, under its paragraph heading
+            item = section.text.split("\n")[line]
+            text = f"**{section.heading}:**\n{item}" if section.heading else item
+        if _WANTS_PUNISHMENT.search(query) and section.kind != "punishment":
+            punishment = next((other.text for other in sections if other.kind == "punishment"), None)
+            if punishment:
+                text = f"{text}\n\n{punishment}"
+        return text
+
+    def lookup(self, query, preferred=()):
+        """Return the SectionHit for the first identifier cited in a normalized query, or None.
+
+        When several entries cite it, one in `preferred` (e.g. the entries
+        whose keywords also occur in the query) wins, then file order. Acts
+        are only looked up when nothing is preferred: "consumer protection
+        act" is better answered by the whole consumer protection entry than by
+        the line naming the act.
+        """
+        for key in self.query_keys(query):
+            if preferred and key.endswith(" act"):
+                continue
+            positions = self.citations[key]
+            position = next((found for found in positions if found[0] in preferred), positions[0])
+            return SectionHit(key, position[0], self.text(position, query))
+        return None
+
+    def hits(self, key):
+        """Every SectionHit for one identifier, in file order."""
+        return [SectionHit(key, position[0], self.text(position)) for position in self.citations.get(key, ())]
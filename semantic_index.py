@@ -0,0 +1,278 @@
+"""Offline semantic retrieval over legal_patterns.json.
+
+Every entry is embedded ahead of time with a local sentence-transformers
+model and stored as a float32 matrix next to a manifest holding the sha256 of
+the pattern file it was built from. At runtime the matrix is memory-mapped and
+queries are answered with a vectorized cosine top-k search.
+
+Build (or refresh) the index with:
+
+    python semantic_index.py --patterns legal_patterns.json
+
+The build is skipped when the manifest already matches the pattern file.
+Builds take an exclusive lock file in the index directory, so when several
+processes miss the index at once (API or batch workers) only one of them
+embeds the patterns; the others keep using the keyword matcher until it is on
+disk.
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent builds still write to separate temporary files
+    fcntl = None
+
+import metrics
+from lazy_imports import lazy_import
+from matcher import split_pattern
+
+INDEX_DIR = os.environ.get("LEGAL_BOT_SEMANTIC_INDEX_DIR", ".semantic_index")
+MODEL_NAME = os.environ.get("LEGAL_BOT_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+THRESHOLD = float(os.environ.get("LEGAL_BOT_SEMANTIC_THRESHOLD", "0.45"))
+AUTOBUILD = os.environ.get("LEGAL_BOT_SEMANTIC_AUTOBUILD", "1") == "1"
+# Seconds to wait before looking for a missing index again
+RETRY_INTERVAL = float(os.environ.get("LEGAL_BOT_SEMANTIC_RETRY", "30"))
+
+VECTORS_FILE = "vectors.npy"
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = "build.lock"
+
+_models = {}
+_models_lock = threading.Lock()
+_builds_started = set()
+_builds_lock = threading.Lock()
+
+
+def load_model(model_name=MODEL_NAME):
+    """Load (once per process) the CPU sentence-transformers model from local files only."""
+    model = _models.get(model_name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(model_name)
+            if model is None:
+                SentenceTransformer = lazy_import("sentence_transformers").SentenceTransformer
+                model = _models[model_name] = SentenceTransformer(
+                    model_name, device="cpu", local_files_only=True
+                )
+    return model
+
+
+def entry_text(item):
+    """Text embedded for one pattern entry: its keywords followed by the response."""
+    keywords = ", ".join(split_pattern(item.get("pattern", "")))
+    return f"{keywords}: {item.get('response', '')}"
+
+
+def file_digest(path):
+    """sha256 of the pattern file, as recorded in the manifest."""
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def read_manifest(index_dir=INDEX_DIR):
+    try:
+        with open(os.path.join(index_dir, MANIFEST_FILE), "r") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _up_to_date(index_dir, digest, model_name, count):
+    manifest = read_manifest(index_dir)
+    return (
+        manifest is not None
+        and manifest.get("digest") == digest
+        and manifest.get("model") == model_name
+        and manifest.get("count") == count
+    )
+
+
+@contextmanager
+def _build_lock(index_dir, wait):
+    """Hold the index directory's build lock; yields False if another process has it and `wait` is false."""
+    if fcntl is None:
+        yield True
+        return
+    with open(os.path.join(index_dir, LOCK_FILE), "a") as file:
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def _replace(path, write):
+    # Write to a temporary file unique to this writer and rename it, so readers
+    # never see a half-written file and concurrent writers never share one
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            write(file)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def build_index(
+    patterns, digest, index_dir=INDEX_DIR, model_name=MODEL_NAME, batch_size=64, force=False, wait=False
+):
+    """Embed every pattern entry and write the matrix plus manifest to `index_dir`.
+
+    Returns False without doing any work when the manifest already matches,
+    or when another process is building the index and `wait` is false.
+    """
+    if not force and _up_to_date(index_dir, digest, model_name, len(patterns)):
+        return False
+
+    os.makedirs(index_dir, exist_ok=True)
+    with _build_lock(index_dir, wait) as locked:
+        # Another process may be building it, or may have just finished
+        if not locked or (not force and _up_to_date(index_dir, digest, model_name, len(patterns))):
+            return False
+
+        np = lazy_import("numpy")
+        model = load_model(model_name)
+        vectors = model.encode(
+            [entry_text(item) for item in patterns],
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).astype(np.float32)
+
+        # The manifest goes last: readers only trust vectors it describes
+        _replace(os.path.join(index_dir, VECTORS_FILE), lambda file: np.save(file, vectors))
+        manifest = {"digest": digest, "model": model_name, "count": len(patterns), "dim": int(vectors.shape[1])}
+        _replace(os.path.join(index_dir, MANIFEST_FILE), lambda file: file.write(json.dumps(manifest).encode()))
+    return True
+
+
+class SemanticIndex:
+    """Memory-mapped embedding matrix answering batched cosine top-k queries."""
+
+    def __init__(self, vectors, model_name=MODEL_NAME, threshold=THRESHOLD):
+        self.vectors = vectors
+        self.model_name = model_name
+        self.threshold = threshold
+
+    @classmethod
+    def open(cls, digest, index_dir=INDEX_DIR, model_name=MODEL_NAME, threshold=THRESHOLD):
+        """Open the index for `digest`, or return None if it is missing or stale."""
+        manifest = read_manifest(index_dir)
+        if manifest is None or manifest.get("digest") != digest or manifest.get("model") != model_name:
+            return None
+        try:
+            vectors = lazy_import("numpy").load(os.path.join(index_dir, VECTORS_FILE), mmap_mode="r")
+        except (ImportError, OSError, ValueError):
+            return None
+        if vectors.shape[0] != manifest.get("count"):
+            return None
+        return cls(vectors, model_name, threshold)
+
+    def search(self, queries, k=3):
+        """Return, for each query, up to `k` (index, score) pairs above the threshold."""
+        np = lazy_import("numpy")
+        embeddings = load_model(self.model_name).encode(
+            list(queries), normalize_embeddings=True, convert_to_numpy=True, show_progress_bar=False
+        ).astype(np.float32)
+        scores = embeddings @ self.vectors.T
+        k = min(k, scores.shape[1])
+        if k == 0:
+            return [[] for _ in queries]
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            ranked = candidates[np.argsort(-row[candidates])]
+            results.append([(int(i), float(row[i])) for i in ranked if row[i] >= self.threshold])
+        return results
+
+
+def build_in_background(snapshot):
+    """Start building the index for `snapshot` in a thread, once per pattern-file version and process.
+
+    Sessions keep using the keyword matcher until the new index is on disk.
+    """
+    with _builds_lock:
+        if snapshot.digest in _builds_started:
+            return
+        _builds_started.add(snapshot.digest)
+
+    def _build():
+        try:
+            build_index(snapshot.patterns, snapshot.digest)
+        except Exception as error:
+            metrics.record_error("semantic_build", error)
+        else:
+            # Open the new index on the next lookup instead of after the retry interval
+            snapshot.forget("semantic")
+
+    threading.Thread(target=_build, daemon=True).start()
+
+
+def _open_for_snapshot(snapshot):
+    # The time is kept so a missing index is only looked for again after RETRY_INTERVAL
+    index = SemanticIndex.open(snapshot.digest)
+    if index is None and AUTOBUILD and snapshot.patterns:
+        build_in_background(snapshot)
+    return index, time.monotonic()
+
+
+def semantic_lookup(snapshot, query):
+    """Return the index of the closest pattern entry for the query, or None.
+
+    None means either that nothing scored above the threshold or that semantic
+    search is unavailable (no numpy/model, or no index for this file version),
+    in which case the caller keeps the substring matcher's answer.
+    """
+    index, opened = snapshot.derived("semantic", _open_for_snapshot)
+    if index is None:
+        # The index may be built (or copied in) later, so look for it again now and then
+        if time.monotonic() - opened >= RETRY_INTERVAL:
+            snapshot.forget("semantic")
+        return None
+    try:
+        results = index.search([query], k=1)[0]
+    except (ImportError, OSError) as error:
+        metrics.record_error("semantic", error)
+        return None
+    return results[0][0] if results else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline semantic index for legal_patterns.json")
+    parser.add_argument("--patterns", default="legal_patterns.json")
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--force", action="store_true", help="rebuild even if the manifest is up to date")
+    args = parser.parse_args()
+
+    with open(args.patterns, "r") as file:
+        patterns = json.load(file)
+    built = build_index(
+        patterns,
+        file_digest(args.patterns),
+        index_dir=args.index_dir,
+        model_name=args.model,
+        batch_size=args.batch_size,
+        force=args.force,
+        wait=True,
+    )
+    print("Semantic index built." if built else "Semantic index is up to date.")
+
+
+if __name__ == "__main__":
+    main()
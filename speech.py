@@ -0,0 +1,203 @@
+"""Long-lived speech services: speech-to-text and queued, cancellable text-to-speech.
+
+Both services are created once per process and reused across Streamlit
+reruns. Audio sources, the recognizer call and the TTS backend are
+injectable, so the pipeline also runs offline, e.g. with
+`sr.AudioFile("query.wav")` as the source and `RecordingBackend()` as the
+speech output.
+"""
+import queue
+import re
+import threading
+import time
+
+import metrics
+from lazy_imports import lazy_import
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+_LINK = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+
+
+def speech_chunks(text):
+    """Split a (markdown) response into sentences suitable for speaking one by one."""
+    text = _LINK.sub(r"\1", text).replace("**", "")
+    chunks = []
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip().lstrip("-").strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+
+class SpeechRecognizerService:
+    """Reusable recognizer with a cached ambient-noise calibration.
+
+    `adjust_for_ambient_noise` only runs when the last calibration is older
+    than `calibration_ttl` seconds, instead of on every button press.
+    """
+
+    def __init__(self, source_factory=None, recognize=None, calibration_ttl=300.0, calibration_duration=0.5):
+        self.recognizer = lazy_import("speech_recognition").Recognizer()
+        self.source_factory = source_factory or self._microphone
+        self.recognize = recognize or self.recognizer.recognize_google
+        self.calibration_ttl = calibration_ttl
+        self.calibration_duration = calibration_duration
+        self._microphone_source = None
+        self._calibrated_at = None
+        self._lock = threading.Lock()
+
+    def _microphone(self):
+        # sr.Microphone() probes the audio device; do that once and reopen the stream per capture
+        if self._microphone_source is None:
+            self._microphone_source = lazy_import("speech_recognition").Microphone()
+        return self._microphone_source
+
+    def calibrate(self, source):
+        self.recognizer.adjust_for_ambient_noise(source, duration=self.calibration_duration)
+        self._calibrated_at = time.monotonic()
+
+    def needs_calibration(self):
+        return self._calibrated_at is None or time.monotonic() - self._calibrated_at > self.calibration_ttl
+
+    def listen(self, timeout=None, phrase_time_limit=None, calibrate=True):
+        """Capture one utterance and return its transcription.
+
+        Raises the speech_recognition errors (WaitTimeoutError,
+        UnknownValueError, RequestError) for the caller to report.
+        """
+        with self._lock:
+            with self.source_factory() as source:
+                if calibrate and self.needs_calibration():
+                    with metrics.timer("speech_calibrate"):
+                        self.calibrate(source)
+                with metrics.timer("speech_listen"):
+                    audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        with metrics.timer("speech_recognize"):
+            return self.recognize(audio)
+
+
+class Pyttsx3Backend:
+    """Speaks through pyttsx3. Created on the TTS worker thread, which pyttsx3 requires."""
+
+    def __init__(self):
+        self.engine = lazy_import("pyttsx3").init()
+
+    def say(self, text):
+        self.engine.say(text)
+        self.engine.runAndWait()
+
+    def stop(self):
+        self.engine.stop()
+
+
+class RecordingBackend:
+    """Stub backend that records what would have been spoken (for offline runs)."""
+
+    def __init__(self):
+        self.spoken = []
+
+    def say(self, text):
+        self.spoken.append(text)
+
+    def stop(self):
+        pass
+
+
+class SpeechSynthesizer:
+    """Single TTS worker fed by a bounded queue of sentence chunks.
+
+    `speak()` returns immediately; the worker starts talking as soon as the
+    first sentence is queued. `stop()` cancels everything queued and the
+    chunk being spoken: chunks carry the generation they were queued in and
+    are skipped once `stop()` has moved to a newer generation.
+    """
+
+    def __init__(self, backend_factory=Pyttsx3Backend, max_queue=64):
+        self.backend_factory = backend_factory
+        self.backend = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._generation = 0
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_worker(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            self.backend = self.backend_factory()
+        except Exception as error:
+            metrics.record_error("speech_tts", error)
+            self.backend = RecordingBackend()
+        while True:
+            generation, chunk = self._queue.get()
+            try:
+                if generation == self._generation:
+                    with metrics.timer("speech_tts"):
+                        self.backend.say(chunk)
+            except Exception as error:
+                metrics.record_error("speech_tts", error)
+            finally:
+                self._queue.task_done()
+                if self._queue.unfinished_tasks == 0:
+                    self._idle.set()
+
+    def speak(self, text, interrupt=True):
+        """Queue `text` sentence by sentence. Returns False if the queue overflowed."""
+        if interrupt:
+            self.stop()
+        self._ensure_worker()
+        generation = self._generation
+        for chunk in speech_chunks(text):
+            try:
+                self._idle.clear()
+                self._queue.put_nowait((generation, chunk))
+            except queue.Full:
+                return False
+        return True
+
+    def stop(self):
+        """Cancel queued chunks and interrupt the sentence being spoken."""
+        self._generation += 1
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+        if self._queue.unfinished_tasks == 0:
+            self._idle.set()
+        if self.backend is not None:
+            self.backend.stop()
+
+    def wait(self, timeout=None):
+        """Block until everything queued has been spoken (or cancelled)."""
+        return self._idle.wait(timeout)
+
+
+_recognizer_service = None
+_synthesizer = None
+_services_lock = threading.Lock()
+
+
+def get_recognizer_service():
+    """Process-wide SpeechRecognizerService using the default microphone."""
+    global _recognizer_service
+    with _services_lock:
+        if _recognizer_service is None:
+            _recognizer_service = SpeechRecognizerService()
+        return _recognizer_service
+
+
+def get_synthesizer():
+    """Process-wide SpeechSynthesizer using pyttsx3."""
+    global _synthesizer
+    with _services_lock:
+        if _synthesizer is None:
+            _synthesizer = SpeechSynthesizer()
+        return _synthesizer
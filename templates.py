@@ -0,0 +1,171 @@
+"""Legal template PDFs: a per-process byte cache and a full-text clause search index."""
+import os
+import re
+import threading
+from collections import namedtuple
+
+import metrics
+from lazy_imports import lazy_import
+
+# Folder where templates are stored
+TEMPLATES_FOLDER = "template"
+
+# Legal templates with file names
+legal_templates = {
+    "Rental Agreement": "rental_agreement_template.pdf",
+    "Loan Agreement":"loan-agreement-template.pdf",
+    "Employment Agreement": "employment_agreement_template.pdf",
+    "Business Agreement": "partnership_agreement_template.pdf",
+    "Freelancer Agreement": "freelancer_contract_template.pdf",
+    "Invoice Agreement": "invoice_template.pdf",
+    "Lease Agreement": "lease_agreement_template.pdf",
+    "Service Agreement": "service_agreement_template.pdf",
+    "Non-Disclosure Agreement": "nda_template.pdf"
+}
+
+# A page of a template matching a search; `phrase` is True when the whole
+# query occurs verbatim (after normalization) rather than just all its words.
+SearchHit = namedtuple("SearchHit", ["template", "file_name", "page", "phrase", "snippet"])
+
+_TOKEN = re.compile(r"\w+")
+
+
+def _normalize(text):
+    return " ".join(_TOKEN.findall(text.lower()))
+
+
+def extract_pages(path):
+    """Text of every page of a PDF, using PyMuPDF when installed and pypdf otherwise."""
+    try:
+        fitz = lazy_import("fitz")
+    except ImportError:
+        reader = lazy_import("pypdf").PdfReader(path)
+        return [page.extract_text() or "" for page in reader.pages]
+    with fitz.open(path) as document:
+        return [page.get_text() for page in document]
+
+
+class TemplateLibrary:
+    """Serves template bytes from memory and searches their text.
+
+    Each file is read once and kept as an immutable bytes object keyed by its
+    (mtime, size), so reruns only pay an `os.stat`. The search index maps
+    every word to the pages containing it and is rebuilt only when a template
+    file changes.
+    """
+
+    def __init__(self, folder=TEMPLATES_FOLDER, templates=None):
+        self.folder = folder
+        self.templates = dict(templates or legal_templates)
+        self._bytes = {}
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_key = None
+        self._index_lock = threading.Lock()
+
+    def path(self, file_name):
+        return os.path.join(self.folder, file_name)
+
+    def _stat_key(self, file_name):
+        stat = os.stat(self.path(file_name))
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_bytes(self, file_name):
+        """Contents of a template file, or None if it does not exist."""
+        try:
+            key = self._stat_key(file_name)
+        except FileNotFoundError:
+            return None
+        cached = self._bytes.get(file_name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with metrics.timer("template_read"), open(self.path(file_name), "rb") as file:
+            data = file.read()
+        with self._lock:
+            self._bytes[file_name] = (key, data)
+        return data
+
+    def _current_key(self):
+        keys = []
+        for file_name in self.templates.values():
+            try:
+                keys.append((file_name, self._stat_key(file_name)))
+            except FileNotFoundError:
+                pass
+        return tuple(keys)
+
+    def _build_index(self):
+        postings = {}
+        pages = []
+        for label, file_name in self.templates.items():
+            if not os.path.exists(self.path(file_name)):
+                continue
+            try:
+                texts = extract_pages(self.path(file_name))
+            except Exception as error:
+                metrics.record_error("template_index", error)
+                continue
+            for number, text in enumerate(texts, start=1):
+                normalized = _normalize(text)
+                page_id = len(pages)
+                pages.append((label, file_name, number, normalized))
+                for token in set(normalized.split()):
+                    postings.setdefault(token, []).append(page_id)
+        return postings, pages
+
+    def index(self):
+        """Return (postings, pages), building the index on first use or after a template changed."""
+        key = self._current_key()
+        if self._index is None or self._index_key != key:
+            with self._index_lock:
+                if self._index is None or self._index_key != key:
+                    with metrics.timer("template_index"):
+                        self._index = self._build_index()
+                    self._index_key = key
+        return self._index
+
+    def warm(self):
+        """Build the search index in a background thread."""
+        threading.Thread(target=self.index, name="template-index", daemon=True).start()
+
+    def search(self, query, limit=20):
+        """Return SearchHits for pages containing every word of the query, phrase matches first."""
+        tokens = _normalize(query).split()
+        if not tokens:
+            return []
+        postings, pages = self.index()
+        with metrics.timer("template_search"):
+            candidates = None
+            for token in sorted(tokens, key=lambda token: len(postings.get(token, ()))):
+                page_ids = postings.get(token)
+                if not page_ids:
+                    return []
+                candidates = set(page_ids) if candidates is None else candidates.intersection(page_ids)
+                if not candidates:
+                    return []
+
+            phrase = " ".join(tokens)
+            hits = []
+            for page_id in sorted(candidates):
+                label, file_name, number, text = pages[page_id]
+                position = text.find(phrase)
+                if position < 0:
+                    position = text.find(tokens[0])
+                start = max(position - 60, 0)
+                snippet = ("…" if start else "") + text[start:position + len(phrase) + 60] + "…"
+                hits.append(SearchHit(label, file_name, number, phrase in text, snippet))
+            hits.sort(key=lambda hit: not hit.phrase)
+        return hits[:limit]
+
+
+_library = None
+_library_lock = threading.Lock()
+
+
+def get_template_library():
+    """Process-wide TemplateLibrary for the bundled template folder."""
+    global _library
+    with _library_lock:
+        if _library is None:
+            _library = TemplateLibrary()
+        return _library
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from api_server import ApiServer
+from engine import ResponseEngine
+from pattern_store import PatternStore
+
+PATTERNS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "legal_patterns.json")
+
+
+async def _exchange(server, raw):
+    listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+    finally:
+        listener.close()
+        await listener.wait_closed()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(body)
+
+
+def request(server, method, path, payload=None, content_length=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    length = len(body) if content_length is None else content_length
+    raw = f"{method} {path} HTTP/1.1\r\nContent-Length: {length}\r\nConnection: close\r\n\r\n".encode() + body
+    return asyncio.run(_exchange(server, raw))
+
+
+@pytest.fixture(scope="module")
+def server():
+    return ApiServer(ResponseEngine(PatternStore(PATTERNS), semantic=False))
+
+
+def test_answer(server):
+    status, body = request(server, "POST", "/answer", {"query": "punishment for dowry"})
+    assert status == 200
+    assert body["matched"] and body["source"] == "pattern"
+
+
+def test_non_string_language_is_rejected(server):
+    assert request(server, "POST", "/answer", {"query": "x", "language": 5}) == (
+        400, {"error": '"language" must be a string'}
+    )
+    status, body = request(server, "POST", "/answer/batch", {"queries": [{"query": "x", "language": ["hi"]}]})
+    assert status == 400 and "queries[0].language" in body["error"]
+
+
+def test_invalid_content_length(server):
+    assert request(server, "POST", "/answer", content_length="abc")[0] == 400
+
+
+def test_handler_errors_return_500(server, monkeypatch):
+    def broken(query, language=None, context=None):
+        raise ValueError("boom")
+
+    monkeypatch.setattr(server.engine, "answer", broken)
+    assert request(server, "POST", "/answer", {"query": "dowry"}) == (500, {"error": "internal server error"})
+
+
+def test_slow_answers_do_not_block_the_event_loop(server, monkeypatch):
+    # Stands in for a query that triggers a full pattern reload
+    answer = server.engine.answer
+
+    def slow(query, language=None, context=None):
+        time.sleep(0.5)
+        return answer(query, language)
+
+    monkeypatch.setattr(server.engine, "answer", slow)
+
+    async def scenario():
+        listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+
+        async def call(method, path, body=b""):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await reader.read()
+            writer.close()
+            return time.perf_counter()
+
+        started = time.perf_counter()
+        slow_call = asyncio.ensure_future(call("POST", "/answer", b'{"query": "dowry"}'))
+        await asyncio.sleep(0.05)
+        health_done = await call("GET", "/healthz")
+        await slow_call
+        listener.close()
+        await listener.wait_closed()
+        return health_done - started
+
+    assert asyncio.run(scenario()) < 0.4
+
+
+def test_sighup_reload_runs_off_the_event_loop(server, monkeypatch):
+    threads = []
+    monkeypatch.setattr(server.engine, "reload", lambda: threads.append(threading.get_ident()))
+
+    async def scenario():
+        await server.reload()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario())
+    assert threads and threads[0] != loop_thread
@@ -0,0 +1,38 @@
+import io
+import json
+import os
+
+import pytest
+
+import batch_cli
+from conftest import ROOT
+from translations import resolve_language
+
+PATTERNS = os.path.join(ROOT, "legal_patterns.json")
+HINDI = resolve_language("hindi")
+
+
+def _run(tmp_path, rows, **options):
+    path = tmp_path / "queries.jsonl"
+    path.write_text("\n".join(json.dumps(row, ensure_ascii=False) for row in rows), encoding="utf-8")
+    output = io.StringIO()
+    batch_cli.run(str(path), output, PATTERNS, semantic=False, **options)
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+@pytest.mark.parametrize("language", ["hindi", "Hindi", "hi", HINDI])
+def test_row_languages_are_resolved(tmp_path, language):
+    [result] = _run(tmp_path, [{"query": "दहेज", "language": language}])
+    assert result["language"] == HINDI
+    assert result["matched"] and result["source"] == "localized"
+
+
+def test_default_language_is_resolved(tmp_path):
+    results = _run(tmp_path, ["दहेज", {"query": "दहेज", "language": None}], language="hi")
+    assert [result["language"] for result in results] == [HINDI, HINDI]
+    assert all(result["matched"] for result in results)
+
+
+def test_unknown_languages_fall_back_to_the_default(tmp_path):
+    results = _run(tmp_path, [{"query": "dowry", "language": "klingon"}, {"query": "dowry", "language": 7}])
+    assert [result["language"] for result in results] == ["English", "English"]
@@ -0,0 +1,83 @@
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT
+from conversation import ConversationContext, follow_up_kind
+from engine import ResponseEngine
+from matcher import normalize_text
+from pattern_store import PatternStore
+
+
+@pytest.mark.parametrize(
+    "query, kind",
+    [
+        ("what is the punishment for it?", "punishment"),
+        ("what are the pros of it", "pros"),
+        ("any disadvantages of that", "cons"),
+        ("which sections apply to this", "ipc sections"),
+        ("tell me more about it", "response"),
+        # A reference word alone starts a new topic
+        ("is it legal to record calls", None),
+        # So does an asked-for kind without a reference word
+        ("what is the punishment for theft", None),
+    ],
+)
+def test_follow_up_kind(query, kind):
+    assert follow_up_kind(normalize_text(query)) == kind
+
+
+@pytest.fixture
+def engine(tmp_path):
+    shutil.copy(os.path.join(ROOT, "legal_patterns.json"), tmp_path)
+    return ResponseEngine(PatternStore(str(tmp_path / "legal_patterns.json"), check_interval=0), semantic=False)
+
+
+def test_follow_up_returns_the_asked_paragraph(engine):
+    context = ConversationContext()
+    topic = engine.answer("what is dowry", context=context)
+    answer = engine.answer("what is the punishment for it?", context=context)
+    assert answer.source == "context" and answer.index == topic.index
+    assert answer.response.startswith("**Punishment:**")
+    assert "**Punishment:**" in topic.response and answer.response != topic.response
+
+
+def test_reference_word_alone_is_not_a_follow_up(engine):
+    context = ConversationContext()
+    engine.answer("what is dowry", context=context)
+    assert engine.answer("is it legal to record calls", context=context).source != "context"
+
+
+def test_another_keyword_moves_the_topic(engine):
+    context = ConversationContext()
+    dowry = engine.answer("what is dowry", context=context)
+    answer = engine.answer("what about divorce and its punishment", context=context)
+    assert answer.source == "pattern" and answer.index != dowry.index
+    # Later follow-ups are about the new topic
+    assert engine.answer("what are the pros of it", context=context).index == answer.index
+
+
+def test_cited_section_runs_the_section_lookup(engine):
+    context = ConversationContext()
+    engine.answer("what is dowry", context=context)
+    assert engine.answer("what is the punishment for it under section 376", context=context).source == "section"
+
+
+def test_topic_is_dropped_when_the_pattern_file_changes(engine):
+    context = ConversationContext()
+    engine.answer("what is dowry", context=context)
+    with open(engine.store.path, "a") as file:
+        file.write("\n")
+    engine.store.reload()
+
+    assert context.topic_index(engine.store.snapshot()) is None
+    assert engine.answer("what is the punishment for it?", context=context).source != "context"
+
+
+def test_context_is_bounded():
+    context = ConversationContext(max_turns=3)
+    engine = ResponseEngine(PatternStore(os.path.join(ROOT, "legal_patterns.json")), semantic=False)
+    for query in ["what is dowry", "divorce", "theft", "murder", "tell me more about it"]:
+        engine.answer(query, context=context)
+    assert [turn.query for turn in context] == ["theft", "murder", "tell me more about it"]
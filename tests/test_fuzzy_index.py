@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from engine import ResponseEngine
+from fuzzy_index import FuzzyIndex, allowed_distance, edit_distance, english_words
+from pattern_store import PatternStore
+
+PATTERNS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "legal_patterns.json")
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return ResponseEngine(PatternStore(PATTERNS), semantic=False)
+
+
+@pytest.fixture(scope="module")
+def index(engine):
+    return FuzzyIndex.from_snapshot(engine.store.snapshot())
+
+
+@pytest.mark.parametrize(
+    "query, wrong_pattern",
+    [
+        ("is abortion legal in india", "adoption"),
+        ("tagging someone on instagram", "ragging"),
+        ("how do i contact a lawyer", "contract"),
+    ],
+)
+def test_english_words_are_not_corrected_into_keywords(engine, query, wrong_pattern):
+    answer = engine.answer(query)
+    assert answer.source != "fuzzy"
+    assert not answer.corrections
+    assert wrong_pattern not in (answer.pattern or "")
+
+
+@pytest.mark.parametrize("word", ["wealth", "primacy", "tanking", "abortion", "contact", "tagging"])
+def test_dictionary_words_are_known(index, word):
+    assert word in english_words()
+    assert index.correct_word(word) is None
+
+
+@pytest.mark.parametrize(
+    "query, corrected",
+    [
+        ("divorse process", "divorce"),
+        ("what is dowery", "dowry"),
+        ("propety dispute", "property"),
+        ("harrasment at work", "harassment"),
+    ],
+)
+def test_misspelled_keywords_are_still_corrected(engine, query, corrected):
+    answer = engine.answer(query)
+    assert answer.source == "fuzzy"
+    assert [correction.corrected for correction in answer.corrections] == [corrected]
+
+
+def test_two_edits_only_for_long_words():
+    assert allowed_distance("murd") == 0
+    assert allowed_distance("abortion") == 1
+    assert allowed_distance("harrasment") == 2
+
+
+def test_edit_distance_counts_transpositions_and_respects_limit():
+    assert edit_distance("murder", "mudrer", 2) == 1
+    assert edit_distance("abortion", "adoption", 2) == 2
+    assert edit_distance("abortion", "adoption", 1) == 2
+
+
+def test_missing_dictionary_leaves_pattern_vocabulary(tmp_path):
+    words = english_words(str(tmp_path / "missing.txt"))
+    assert words == frozenset()
+    index = FuzzyIndex([{"pattern": "divorce", "response": "Divorce law."}], dictionary=words)
+    assert index.correct_word("divorse").corrected == "divorce"
@@ -0,0 +1,28 @@
+from matcher import PatternMatcher, normalize_text
+
+PATTERNS = [
+    {"pattern": "tax", "response": "Tax law covers income tax returns."},
+    {"pattern": "tax evasion", "response": "Tax evasion is punishable."},
+    {"pattern": "defamation", "response": "Defamation law: lawsuits for damages."},
+    {"pattern": "defamation", "response": "Defamation law: Sections 499-502 of the IPC."},
+]
+
+
+def best(matcher, query):
+    return matcher.best(normalize_text(query)).index
+
+
+def test_longest_keyword_wins():
+    assert best(PatternMatcher(PATTERNS), "what is the penalty for tax evasion") == 1
+
+
+def test_shared_keyword_resolved_by_response_words():
+    matcher = PatternMatcher(PATTERNS)
+    assert best(matcher, "defamation sections under ipc") == 3
+    assert best(matcher, "defamation damages") == 2
+    # Nothing distinguishes them: file order
+    assert best(matcher, "defamation") == 2
+
+
+def test_shadowed_entries_are_listed():
+    assert PatternMatcher(PATTERNS).shadowed == [3]
@@ -0,0 +1,32 @@
+import os
+
+import metrics
+from conftest import ROOT
+from engine import ResponseEngine
+from pattern_store import get_pattern_store
+from translations import resolve_language
+
+
+def _pattern_hits(registry):
+    return {
+        (counter["labels"]["index"], counter["labels"]["language"]): counter
+        for counter in registry.snapshot()["counters"]
+        if counter["name"] == "legal_bot_pattern_hits_total"
+    }
+
+
+def test_localized_hits_are_labelled_with_the_english_entry(monkeypatch):
+    registry = metrics.Registry()
+    monkeypatch.setattr(metrics, "record_answer", registry.record_answer)
+    engine = ResponseEngine(get_pattern_store(os.path.join(ROOT, "legal_patterns.json")), semantic=False)
+
+    english = engine.answer("what is the punishment for rape", "English")
+    hindi = engine.answer("बलात्कार की सज़ा", resolve_language("hindi"))
+    assert hindi.source == "localized"
+    assert hindi.index == english.index
+
+    hits = _pattern_hits(registry)
+    english_hit = hits[(str(english.index), "English")]
+    hindi_hit = hits[(str(english.index), hindi.language)]
+    assert hindi_hit["labels"]["pattern"] == english_hit["labels"]["pattern"] == english.pattern.strip()
+    assert registry.pattern_hits() == {english.index: 2}
@@ -0,0 +1,113 @@
+import hashlib
+import json
+
+import pytest
+
+import metrics
+from pattern_db import HEADER, PatternDB, open_pattern_db, pattern_db_path, write_pattern_db
+from pattern_store import PatternStore
+
+PATTERNS = [
+    {"pattern": "divorce|separation", "response": "**Divorce:** Hindu Marriage Act, 1955."},
+    {"pattern": "dowry", "response": "Dowry Prohibition Act, 1961."},
+    {"pattern": "दहेज", "response": "दहेज निषेध अधिनियम, 1961।"},
+    # Repeated pattern strings and responses are stored once
+    {"pattern": "dowry", "response": "Dowry Prohibition Act, 1961."},
+    {"pattern": "", "response": ""},
+]
+
+
+def _digest(patterns):
+    return hashlib.sha256(json.dumps(patterns).encode("utf-8")).hexdigest()
+
+
+@pytest.fixture
+def pattern_file(tmp_path):
+    path = tmp_path / "legal_patterns.json"
+    path.write_text(json.dumps(PATTERNS))
+    return str(path)
+
+
+def _errors(stage):
+    return sum(
+        counter["value"]
+        for counter in metrics.REGISTRY.snapshot()["counters"]
+        if counter["name"] == "legal_bot_errors_total" and counter["labels"] == {"stage": stage}
+    )
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "patterns.bin")
+    write_pattern_db(PATTERNS, path, _digest(PATTERNS))
+
+    db = PatternDB(path)
+    assert db.digest == _digest(PATTERNS)
+    assert len(db) == len(PATTERNS)
+    assert [dict(entry) for entry in db] == PATTERNS
+    assert dict(db[-1]) == PATTERNS[-1]
+    assert [dict(entry) for entry in db[1:3]] == PATTERNS[1:3]
+    with pytest.raises(IndexError):
+        db[len(PATTERNS)]
+    with pytest.raises(KeyError):
+        db[0]["ref"]
+
+
+def test_entries_with_other_fields_are_not_compiled(tmp_path):
+    with pytest.raises(ValueError):
+        write_pattern_db([{"pattern": "rape", "ref": "rape", "response": "..."}], str(tmp_path / "x.bin"), "00" * 32)
+
+
+def test_open_checks_the_digest(tmp_path):
+    path = str(tmp_path / "patterns.bin")
+    assert open_pattern_db(path) is None
+    write_pattern_db(PATTERNS, path, _digest(PATTERNS))
+    assert open_pattern_db(path, _digest(PATTERNS)) is not None
+    assert open_pattern_db(path, _digest([])) is None
+
+
+def test_store_maps_a_matching_database(pattern_file):
+    with open(pattern_file, "rb") as file:
+        digest = hashlib.sha256(file.read()).hexdigest()
+    write_pattern_db(PATTERNS, pattern_db_path(pattern_file), digest)
+
+    store = PatternStore(pattern_file)
+    assert store.stats()["compiled"]
+    snapshot = store.snapshot()
+    assert [dict(entry) for entry in snapshot.patterns] == PATTERNS
+    assert snapshot.matcher.best("how do i file for separation").index == 0
+
+
+def test_store_ignores_a_stale_database(pattern_file):
+    with open(pattern_file, "rb") as file:
+        digest = hashlib.sha256(file.read()).hexdigest()
+    write_pattern_db(PATTERNS, pattern_db_path(pattern_file), digest)
+    store = PatternStore(pattern_file)
+    assert store.stats()["compiled"]
+
+    # The JSON changes after the database was built: it must be parsed again
+    edited = PATTERNS[:2] + [{"pattern": "cheque bounce", "response": "Section 138, NI Act."}]
+    with open(pattern_file, "w") as file:
+        json.dump(edited, file)
+    snapshot = store.reload(force=True)
+    assert not store.stats()["compiled"]
+    assert snapshot.patterns == edited
+    assert snapshot.matcher.best("cheque bounce case").index == 2
+
+
+@pytest.mark.parametrize("corrupt", [b"not a pattern database", "truncated", b""])
+def test_store_falls_back_to_json_for_a_corrupt_database(pattern_file, corrupt):
+    path = pattern_db_path(pattern_file)
+    if corrupt == "truncated":
+        with open(pattern_file, "rb") as file:
+            write_pattern_db(PATTERNS, path, hashlib.sha256(file.read()).hexdigest())
+        with open(path, "r+b") as file:
+            file.truncate(HEADER.size + 4)
+    else:
+        with open(path, "wb") as file:
+            file.write(corrupt)
+    errors = _errors("pattern_db")
+
+    store = PatternStore(pattern_file)
+    assert not store.stats()["compiled"]
+    assert store.snapshot().patterns == PATTERNS
+    assert _errors("pattern_db") == errors + 1
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+
+import pytest
+
+import metrics
+import pattern_store
+from pattern_store import PatternStore
+
+PATTERNS = [
+    {"pattern": "divorce", "response": "Divorce law."},
+    {"pattern": "dowry", "response": "Dowry Prohibition Act, 1961."},
+]
+
+
+def _write(path, content, mtime_ns):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content if isinstance(content, str) else json.dumps(content))
+    # Explicit, distinct mtimes: some filesystems only keep whole seconds
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "legal_patterns.json")
+    _write(path, PATTERNS, 1_000_000_000_000)
+    return path
+
+
+@pytest.fixture
+def hashes(monkeypatch):
+    """Count how often the store hashes the file, i.e. actually reads it."""
+    calls = []
+    sha256 = hashlib.sha256
+
+    def counting(data):
+        calls.append(len(data))
+        return sha256(data)
+
+    monkeypatch.setattr(pattern_store.hashlib, "sha256", counting)
+    return calls
+
+
+def _errors(stage):
+    return sum(
+        counter["value"]
+        for counter in metrics.REGISTRY.snapshot()["counters"]
+        if counter["name"] == "legal_bot_errors_total" and counter["labels"] == {"stage": stage}
+    )
+
+
+def test_unchanged_stat_skips_the_read(path, hashes):
+    store = PatternStore(path, check_interval=0)
+    first = store.snapshot()
+    assert store.snapshot() is first
+    assert len(hashes) == 1
+    assert store.stats()["checks"] == 3
+
+
+def test_same_content_keeps_the_snapshot(path, hashes):
+    store = PatternStore(path, check_interval=0)
+    first = store.snapshot()
+    _write(path, PATTERNS, 2_000_000_000_000)  # touched, content unchanged
+
+    assert store.snapshot() is first
+    assert len(hashes) == 2  # re-read and hashed, but not re-parsed
+    assert store.stats()["reloads"] == 1
+
+
+def test_changed_content_swaps_the_snapshot(path):
+    store = PatternStore(path, check_interval=0)
+    first = store.snapshot()
+    _write(path, PATTERNS + [{"pattern": "theft", "response": "Section 378."}], 2_000_000_000_000)
+
+    second = store.snapshot()
+    assert second is not first and second.version == first.version + 1
+    assert second.matcher.best("theft case").index == 2
+    # The old snapshot is untouched for queries still holding it
+    assert len(first.patterns) == 2 and first.matcher.best("theft case") is None
+
+
+@pytest.mark.parametrize("broken", ["{not json", json.dumps({"pattern": "not a list"}), None])
+def test_bad_file_keeps_the_last_good_snapshot(path, broken):
+    store = PatternStore(path, check_interval=0)
+    good = store.snapshot()
+    errors = _errors("load_patterns")
+    if broken is None:
+        os.remove(path)
+    else:
+        _write(path, broken, 2_000_000_000_000)
+
+    assert store.snapshot() is good
+    assert store.stats()["last_error"]
+    assert good.error is None  # only an empty store reports the error on its snapshot
+    assert _errors("load_patterns") > errors
+
+    _write(path, PATTERNS[:1], 3_000_000_000_000)
+    assert len(store.snapshot().patterns) == 1
+    assert store.stats()["last_error"] is None
+
+
+def test_store_without_a_good_file_reports_the_error(tmp_path):
+    store = PatternStore(str(tmp_path / "missing.json"))
+    snapshot = store.snapshot()
+    assert snapshot.patterns == [] and snapshot.error == "Patterns file not found."
+
+
+def test_checks_are_throttled_by_check_interval(path, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(pattern_store.time, "monotonic", lambda: now[0])
+    store = PatternStore(path, check_interval=5)
+    first = store.snapshot()
+    _write(path, PATTERNS[:1], 2_000_000_000_000)
+
+    now[0] += 4
+    assert store.snapshot() is first
+    assert store.stats()["checks"] == 1
+
+    now[0] += 1
+    assert len(store.snapshot().patterns) == 1
+    assert store.stats()["checks"] == 2
+
+
+def test_reload_does_not_wait_for_another_reload(path):
+    store = PatternStore(path, check_interval=0)
+    current = store.snapshot()
+    _write(path, PATTERNS[:1], 2_000_000_000_000)
+
+    # Another thread is in the middle of a reload
+    with store._reload_lock:
+        assert store.reload() is current
+        assert store.snapshot() is current
+    assert len(store.snapshot().patterns) == 1
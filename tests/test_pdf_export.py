@@ -0,0 +1,81 @@
+import io
+import os
+
+import pytest
+
+pytest.importorskip("reportlab")
+pypdf = pytest.importorskip("pypdf")
+
+import pdf_export
+from interaction_log import InteractionLog
+
+VERA = os.path.join(os.path.dirname(pytest.importorskip("reportlab").__file__), "fonts", "Vera.ttf")
+
+
+def _fonts_used(pdf):
+    page = pypdf.PdfReader(io.BytesIO(pdf)).pages[0]
+    return {font.get_object()["/BaseFont"] for font in page["/Resources"]["/Font"].values()}
+
+
+def _export(query, response):
+    log = InteractionLog()
+    log.append(query, response)
+    return pdf_export.ChatPdfExporter().export(log)
+
+
+@pytest.fixture
+def fonts(monkeypatch):
+    """Point the exporter at the given font files, with nothing resolved yet."""
+    def use(paths):
+        monkeypatch.setattr(pdf_export, "UNICODE_FONTS", paths)
+        monkeypatch.setattr(pdf_export, "_script_fonts", {})
+    return use
+
+
+def test_line_script():
+    assert pdf_export.line_script("तलाक कानून") == "Devanagari"
+    assert pdf_export.line_script("• விவாகரத்து") == "Tamil"
+    assert pdf_export.line_script("విడాకులు") == "Telugu"
+    assert pdf_export.line_script("ವಿಚ್ಛೇದನ") == "Kannada"
+    assert pdf_export.line_script("വിവാഹമോചനംൻ") == "Malayalam"
+    assert pdf_export.line_script("divorce law (Section 13)") is None
+
+
+def test_latin_lines_keep_the_standard_fonts(fonts):
+    fonts([VERA])
+    pdf = _export("divorce law", "**Divorce:**\n- Hindu Marriage Act, 1955")
+    assert _fonts_used(pdf) <= {"/Helvetica", "/Helvetica-Bold", "/ZapfDingbats"}
+
+
+def test_falls_back_to_helvetica_without_a_covering_font(fonts, caplog):
+    # Vera has no Devanagari glyphs, and a missing file is skipped
+    fonts(["/nonexistent/font.ttf", VERA])
+    assert pdf_export.script_font("Devanagari") is None
+    assert "no font for Devanagari" in caplog.text
+
+    pdf = _export("तलाक कानून", "तलाक के लिए आवेदन")
+    assert "/Helvetica" in _fonts_used(pdf)
+
+
+SAMPLES = {
+    "Devanagari": "तलाक कानून",
+    "Telugu": "విడాకుల చట్టం",
+    "Tamil": "விவாகரத்து சட்டம்",
+    "Kannada": "ವಿಚ್ಛೇದನ ಕಾನೂನು",
+    "Malayalam": "വിവാഹമോചന നിയമം",
+}
+
+
+@pytest.mark.parametrize("script", sorted(SAMPLES))
+def test_indic_lines_use_a_unicode_font(fonts, script):
+    if pdf_export.script_font(script) is None:
+        pytest.skip(f"no {script} font installed")
+    fonts([VERA] + pdf_export.UNICODE_FONTS)
+    pdf = _export(SAMPLES[script], f"**{SAMPLES[script]}:**\n{SAMPLES[script]}\n\nSection 13")
+
+    used = _fonts_used(pdf)
+    # Embedded TrueType subsets are named "/ABCDEF+FontName"
+    assert any("+" in font for font in used)
+    assert "/Helvetica" in used  # the Latin line
+    text = pypdf.PdfReader(io.BytesIO(pdf)).pages[0].extract_text()
+    assert SAMPLES[script].split()[0] in text
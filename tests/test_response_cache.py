@@ -0,0 +1,130 @@
+import json
+import os
+import shutil
+import threading
+
+import pytest
+
+import response_cache
+from conftest import ROOT
+from engine import Answer, ResponseEngine
+from pattern_store import PatternStore
+from response_cache import ResponseCache
+from translations import resolve_language
+
+
+def _answer(query, matched=True):
+    return Answer(query, "English", f"response to {query}", matched, "pattern" if matched else None, None, None, 1)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache, "time", clock)
+    return clock
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", 1, _answer("a"))
+    cache.put("b", 1, _answer("b"))
+    assert cache.get("a", 1) is not None  # "b" is now the least recently used
+    cache.put("c", 1, _answer("c"))
+
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1).query == "a" and cache.get("c", 1).query == "c"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_negative_entries_expire_sooner(clock):
+    cache = ResponseCache(ttl=100, negative_ttl=10)
+    cache.put("divorce", 1, _answer("divorce"))
+    cache.put("gibberish", 1, _answer("gibberish", matched=False))
+    assert cache.get("gibberish", 1) is not None
+    assert cache.stats()["negative_hits"] == 1
+
+    clock.now += 11
+    assert cache.get("gibberish", 1) is None
+    assert cache.get("divorce", 1) is not None
+
+    clock.now += 90
+    assert cache.get("divorce", 1) is None
+    stats = cache.stats()
+    assert stats["expirations"] == 2 and stats["size"] == 0
+
+
+def test_new_pattern_version_empties_the_cache():
+    cache = ResponseCache()
+    cache.put("dowry", 1, _answer("dowry"))
+    assert cache.get("dowry", 1) is not None
+
+    assert cache.get("dowry", 2) is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["size"] == 0
+    # An empty cache seeing another version is not counted again
+    assert cache.get("dowry", 3) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_localized_version_is_part_of_the_key(tmp_path):
+    shutil.copy(os.path.join(ROOT, "legal_patterns.json"), tmp_path)
+    shutil.copytree(os.path.join(ROOT, "locales"), tmp_path / "locales")
+    cache = ResponseCache()
+    engine = ResponseEngine(PatternStore(str(tmp_path / "legal_patterns.json")), semantic=False, cache=cache)
+    hindi = resolve_language("hindi")
+
+    english = engine.answer("punishment for dowry", "English")
+    first = engine.answer("दहेज", hindi)
+    assert first.source == "localized"
+    assert engine.answer("दहेज", hindi) is first
+    assert cache.stats()["hits"] == 1
+
+    # Editing the Hindi file changes only the Hindi part of the key
+    path = engine.locale_path(hindi)
+    with open(path, encoding="utf-8") as file:
+        patterns = json.load(file)
+    for item in patterns:
+        if "दहेज" in item["pattern"]:
+            item["response"] = "नया उत्तर"
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(patterns, file, ensure_ascii=False)
+    engine.locale_store(hindi).reload(force=True)
+
+    assert engine.answer("दहेज", hindi).response == "नया उत्तर"
+    assert engine.answer("punishment for dowry", "English") is english
+    assert cache.stats()["invalidations"] == 0
+
+
+def test_concurrent_gets_and_puts():
+    cache = ResponseCache(max_entries=64)
+    errors = []
+
+    def work(worker):
+        try:
+            for number in range(2000):
+                key = f"query {number % 100}"
+                cache.put(key, 1, _answer(key))
+                found = cache.get(f"query {(number * worker) % 100}", 1)
+                assert found is None or found.query == f"query {(number * worker) % 100}"
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=work, args=(worker,)) for worker in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    stats = cache.stats()
+    assert stats["size"] <= 64
+    assert stats["hits"] + stats["misses"] == 8 * 2000
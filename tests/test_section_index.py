@@ -0,0 +1,86 @@
+import pytest
+
+from matcher import normalize_text
+from section_index import Section, SectionIndex, citations, parse_sections
+
+RESPONSE = (
+    "Defamation harms a person's reputation. **Punishment:** Simple imprisonment up to 2 years.\n\n"
+    "**Indian Penal Code (IPC) Sections:**\n"
+    "- Section 499: Definition of defamation\n"
+    "- Section 500: Punishment for defamation\n\n"
+    "**Pros:** Protects reputation.\n\n"
+    "See also the Consumer Protection Act, 2019."
+)
+
+PATTERNS = [
+    {"pattern": "defamation", "response": RESPONSE},
+    {"pattern": "cheating|fraud", "response": "Cheating is an offence.\n\n**IPC Sections:** Section 420 (Cheating)."},
+    {"pattern": "online fraud", "response": "Online fraud.\n\n**IPC Sections:** Section 420, Section 66D (IT Act)."},
+    {"pattern": "consumer rights", "response": "Consumers are protected by the Consumer Protection Act, 2019."},
+]
+
+
+def test_parse_sections():
+    sections = parse_sections(RESPONSE)
+    assert [section.kind for section in sections] == ["overview", "punishment", "ipc sections", "pros", "text"]
+    assert sections[0] == Section("overview", None, "Defamation harms a person's reputation.")
+    assert sections[1].text == "**Punishment:** Simple imprisonment up to 2 years."
+    assert sections[2].heading == "Indian Penal Code (IPC) Sections"
+
+
+@pytest.mark.parametrize(
+    "text, keys",
+    [
+        ("Sections 499-502 (Defamation)", ["section 499", "section 502", "section 500", "section 501"]),
+        ("Sections 415 and 420", ["section 415", "section 420"]),
+        ("Section 304A and Article 21", ["section 304A", "article 21"]),
+        # Implausibly long ranges are not expanded
+        ("Sections 1-200", ["section 1", "section 200"]),
+        ("under the Consumer Protection Act, 2019", ["consumer protection act"]),
+        ("The Juvenile Justice (Care and Protection of Children) Act", ["juvenile justice (care and protection of children) act"]),
+    ],
+)
+def test_citations(text, keys):
+    assert citations(text) == keys
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SectionIndex(PATTERNS)
+
+
+@pytest.mark.parametrize(
+    "query, keys",
+    [
+        ("what is ipc 499", ["section 499"]),
+        ("499 ipc explained", ["section 499"]),
+        ("case u/s 420", ["section 420"]),
+        ("sec. 500 punishment", ["section 500"]),
+        ("section 66d of the it act", ["section 66D"]),
+        ("is consumer protection act useful", ["consumer protection act"]),
+        ("section 123", []),  # not cited anywhere
+        ("what does it act like", []),  # two-letter act names are not matched
+    ],
+)
+def test_query_keys(index, query, keys):
+    assert index.query_keys(normalize_text(query)) == keys
+
+
+def test_lookup_returns_the_citing_list_item(index):
+    hit = index.lookup("section 500")
+    assert hit.key == "section 500" and hit.index == 0
+    assert hit.text == "**Indian Penal Code (IPC) Sections:**\n- Section 500: Punishment for defamation"
+
+
+def test_lookup_appends_the_punishment_when_asked(index):
+    assert index.lookup("punishment under section 499").text.endswith("**Punishment:** Simple imprisonment up to 2 years.")
+
+
+def test_lookup_prefers_entries_whose_keywords_matched(index):
+    assert index.lookup("section 420").index == 1  # file order
+    assert index.lookup("online fraud section 420", preferred={2}).index == 2
+
+
+def test_acts_are_skipped_when_a_keyword_matched(index):
+    assert index.lookup("consumer protection act").index == 0
+    assert index.lookup("consumer rights and the consumer protection act", preferred={3}) is None
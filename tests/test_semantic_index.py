@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+import threading
+
+import pytest
+
+import semantic_index
+from pattern_store import PatternStore
+
+fcntl = semantic_index.fcntl
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "legal_patterns.json"
+    path.write_text(json.dumps([{"pattern": "divorce", "response": "Divorce law."}]))
+    return PatternStore(str(path)).snapshot()
+
+
+@pytest.fixture
+def opens(monkeypatch):
+    """Count attempts to open the index, which is never there."""
+    calls = []
+    monkeypatch.setattr(semantic_index.SemanticIndex, "open", classmethod(lambda cls, digest: calls.append(digest)))
+    monkeypatch.setattr(semantic_index, "AUTOBUILD", False)
+    return calls
+
+
+def test_missing_index_is_not_looked_for_on_every_query(snapshot, opens, monkeypatch):
+    monkeypatch.setattr(semantic_index, "RETRY_INTERVAL", 60)
+    for _ in range(5):
+        assert semantic_index.semantic_lookup(snapshot, "separation") is None
+    assert len(opens) == 1
+
+
+def test_missing_index_is_looked_for_again_after_the_retry_interval(snapshot, opens, monkeypatch):
+    monkeypatch.setattr(semantic_index, "RETRY_INTERVAL", 0)
+    semantic_index.semantic_lookup(snapshot, "separation")
+    semantic_index.semantic_lookup(snapshot, "separation")
+    assert len(opens) == 2
+
+
+def test_one_background_build_per_version(snapshot, monkeypatch):
+    monkeypatch.setattr(semantic_index, "_builds_started", set())
+    built = []
+    done = threading.Event()
+
+    def build_index(patterns, digest):
+        built.append(digest)
+        done.set()
+
+    monkeypatch.setattr(semantic_index, "build_index", build_index)
+    threads = [threading.Thread(target=semantic_index.build_in_background, args=(snapshot,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert done.wait(5)
+    assert built == [snapshot.digest]
+
+
+class FakeModel:
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, **options):
+        self.encoded += 1
+        np = pytest.importorskip("numpy")
+        return np.ones((len(texts), 4))
+
+
+@pytest.fixture
+def model(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(semantic_index, "load_model", lambda model_name=None: model)
+    return model
+
+
+@pytest.mark.skipif(semantic_index.fcntl is None, reason="builds are only locked where fcntl exists")
+def test_build_is_skipped_while_another_process_holds_the_lock(snapshot, model, tmp_path):
+    index_dir = str(tmp_path / "index")
+    os.makedirs(index_dir)
+    # A separate open file description conflicts with the builder's flock, as another process would
+    with open(os.path.join(index_dir, semantic_index.LOCK_FILE), "a") as other:
+        fcntl.flock(other, fcntl.LOCK_EX)
+        assert not semantic_index.build_index(snapshot.patterns, snapshot.digest, index_dir=index_dir)
+    assert model.encoded == 0
+    assert os.listdir(index_dir) == [semantic_index.LOCK_FILE]
+
+
+def test_build_writes_through_unique_temporary_files(snapshot, model, tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    index_dir = str(tmp_path / "index")
+    temporaries = []
+    mkstemp = tempfile.mkstemp
+
+    def record(**options):
+        descriptor, path = mkstemp(**options)
+        temporaries.append(path)
+        return descriptor, path
+
+    monkeypatch.setattr(tempfile, "mkstemp", record)
+    assert semantic_index.build_index(snapshot.patterns, snapshot.digest, index_dir=index_dir)
+    assert len(set(temporaries)) == 2
+    assert sorted(os.listdir(index_dir)) == sorted(
+        [semantic_index.LOCK_FILE, semantic_index.MANIFEST_FILE, semantic_index.VECTORS_FILE]
+    )
+    # Up to date now, including for a builder that was waiting for the lock
+    assert not semantic_index.build_index(snapshot.patterns, snapshot.digest, index_dir=index_dir, wait=True)
+    assert model.encoded == 1
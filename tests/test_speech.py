@@ -0,0 +1,109 @@
+import math
+import struct
+import threading
+import wave
+
+import pytest
+
+from speech import RecordingBackend, SpeechRecognizerService, SpeechSynthesizer, speech_chunks
+
+def test_speech_chunks():
+    text = (
+        "**Dowry** is illegal. Giving or taking it is an offence!\n\n"
+        "- See [the Act](https://example.com/act) for details?\n"
+        "- Section 3: punishment"
+    )
+    assert speech_chunks(text) == [
+        "Dowry is illegal.",
+        "Giving or taking it is an offence!",
+        "See the Act for details?",
+        "Section 3: punishment",
+    ]
+    assert speech_chunks("  \n\n ") == []
+
+
+class BlockingBackend(RecordingBackend):
+    """Records chunks, holding each one until the test releases it."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def say(self, text):
+        self.started.set()
+        self.release.wait(5)
+        super().say(text)
+
+
+def test_chunks_are_spoken_in_order():
+    backend = RecordingBackend()
+    synthesizer = SpeechSynthesizer(backend_factory=lambda: backend)
+    assert synthesizer.speak("First sentence. Second sentence! Third?")
+    assert synthesizer.wait(5)
+    assert backend.spoken == ["First sentence.", "Second sentence!", "Third?"]
+
+
+def test_stop_cancels_queued_chunks():
+    backend = BlockingBackend()
+    synthesizer = SpeechSynthesizer(backend_factory=lambda: backend)
+    synthesizer.speak("One. Two. Three. Four.")
+    assert backend.started.wait(5)  # "One." is being spoken
+
+    synthesizer.stop()
+    backend.release.set()
+    assert synthesizer.wait(5)
+    # Only the chunk already handed to the backend got through
+    assert backend.spoken == ["One."]
+
+    synthesizer.speak("Five.", interrupt=False)
+    assert synthesizer.wait(5)
+    assert backend.spoken == ["One.", "Five."]
+
+
+def test_queue_overflow_is_reported():
+    backend = BlockingBackend()
+    synthesizer = SpeechSynthesizer(backend_factory=lambda: backend, max_queue=2)
+    assert not synthesizer.speak("One. Two. Three. Four. Five.")
+    backend.release.set()
+    synthesizer.stop()
+
+
+@pytest.fixture
+def audio_file(tmp_path):
+    # Half a second of quiet, then a second of a loud tone the recognizer takes for a phrase
+    path = str(tmp_path / "query.wav")
+    rate = 16000
+    samples = [0] * (rate // 2) + [int(12000 * math.sin(2 * math.pi * 440 * n / rate)) for n in range(rate)]
+    with wave.open(path, "wb") as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(rate)
+        file.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+    return path
+
+
+def test_calibration_is_reused_within_its_ttl(audio_file):
+    sr = pytest.importorskip("speech_recognition")
+    heard = []
+    service = SpeechRecognizerService(
+        source_factory=lambda: sr.AudioFile(audio_file),
+        recognize=lambda audio: heard.append(audio) or "divorce law",
+        calibration_ttl=300,
+        calibration_duration=0.25,
+    )
+    calibrations = []
+    adjust = service.recognizer.adjust_for_ambient_noise
+    service.recognizer.adjust_for_ambient_noise = lambda source, duration: calibrations.append(duration) or adjust(
+        source, duration=duration
+    )
+
+    assert service.listen() == "divorce law"
+    assert service.listen() == "divorce law"
+    assert calibrations == [0.25]
+    assert len(heard) == 2 and all(isinstance(audio, sr.AudioData) for audio in heard)
+
+    # Once the calibration is older than the TTL it is redone
+    service._calibrated_at -= 301
+    service.listen()
+    assert calibrations == [0.25, 0.25]